@@ -0,0 +1,281 @@
+# host side batched engine for training: steps thousands of boards at once with NumPy, a whole piece per step, for fitting bot weights
+# or reinforcement learning where one Game at a time in pure Python is far too slow
+# the rules are the single board game's (tetris/engine.py) at the level of placements: a piece is dealt from the same seeded bags,
+# turned and moved to where the action says, dropped straight down, locked, full lines are cleared and scored, and the game is over
+# when the stack reaches the rows the next piece appears in
+# run with: python batch.py [--boards N] [--steps N] [--parity N] [--pieces N]
+# --parity plays N boards both here and in the single board engine, with the same placements, and checks every board after every piece,
+# for up to --pieces pieces
+import sys
+import time
+import numpy as np
+from tetris.engine import Config, Game
+from tetris.pieces import SHAPES
+from tetris.bot import Bot, placements
+
+# a board's rows are uint16 bitmasks like Area.rows (bit x is column x, the last row is the floor), so a batch is one (boards, height) array
+class BatchEngine(object):
+    def __init__(self, boards, config = None, seeds = None):
+        config = config or Config()
+        self.config = config
+        self.boards = boards
+        self.height = config.height
+        self.width = config.width
+        self.full = (1 << config.width) - 1
+        self.spawnX = config.spawnX
+        self.spawnY = config.spawnY
+        self.linesPerLevel = config.linesPerLevel
+        self.lineScores = np.array(config.lineScores, np.int64)
+        self._tables(config)
+        self.index = np.arange(boards)
+        self.rows = np.zeros((boards, self.height), np.uint16)
+        # tops is the skyline, the highest filled row of every column (the floor's row for an empty one), like Area.tops
+        self.tops = np.zeros((boards, self.width), np.int64)
+        # the random number generator and bag of every board: state is its xorshift32 state, bag the order its last bag was shuffled
+        # into (indices into pieceTypes), dealt how many of that bag have been dealt
+        self.state = np.zeros(boards, np.uint32)
+        self.bag = np.zeros((boards, len(config.pieceTypes)), np.uint8)
+        self.dealt = np.zeros(boards, np.int64)
+        self.pieces = np.zeros(boards, np.int64)
+        self.lines = np.zeros(boards, np.int64)
+        self.score = np.zeros(boards, np.int64)
+        self.level = np.zeros(boards, np.int64)
+        self.placed = np.zeros(boards, np.int64)
+        self.done = np.zeros(boards, bool)
+        self.reset(self.index, np.arange(boards) if seeds is None else np.asarray(seeds))
+    # every piece type and rotation state as arrays: masks (4 rows, with their leftmost column at bit 0), the top row and left column
+    # of the cells in the box, how many columns wide, and how far down from top the lowest cell of each column is (-64 past the last)
+    def _tables(self, config):
+        types = len(config.pieceTypes)
+        self.masks = np.zeros((types, 4, 4), np.uint16)
+        self.shapeTops = np.zeros((types, 4), np.int64)
+        self.lefts = np.zeros((types, 4), np.int64)
+        self.widths = np.zeros((types, 4), np.int64)
+        self.bottoms = np.full((types, 4, 4), -64, np.int64)
+        for t in range(types):
+            for r in range(4):
+                shape = SHAPES[config.pieceTypes[t]][r]
+                self.masks[t, r, :len(shape.masks)] = shape.masks
+                self.shapeTops[t, r] = shape.top
+                self.lefts[t, r] = shape.left
+                self.widths[t, r] = shape.right - shape.left + 1
+                self.bottoms[t, r, :len(shape.bottoms)] = shape.bottoms
+    # starts the boards in which (an index array) over as new games dealt by seeds, the same seed deals what Game(config, seed) does
+    def reset(self, which, seeds):
+        seeds = np.asarray(seeds, np.int64) & 0xFFFFFFFF
+        self.state[which] = np.where(seeds == 0, 0x9E3779B9, seeds).astype(np.uint32)
+        self.rows[which] = 0
+        self.rows[which, -1] = self.full
+        self.tops[which] = self.height - 1
+        self.bag[which] = np.arange(self.bag.shape[1], dtype = np.uint8)
+        self.dealt[which] = self.bag.shape[1]
+        self.lines[which] = 0
+        self.score[which] = 0
+        self.level[which] = 0
+        self.placed[which] = 0
+        self.done[which] = False
+        live = np.zeros(self.boards, bool)
+        live[which] = True
+        self._deal(live)
+    # the next piece of every live board, shuffling a new bag (Fisher-Yates from the last piece down, like PieceBag) where one's finished
+    def _deal(self, live):
+        empty = np.nonzero(live & (self.dealt >= self.bag.shape[1]))[0]
+        if len(empty):
+            state = self.state[empty]
+            bag = self.bag[empty]
+            rows = np.arange(len(empty))
+            for i in range(bag.shape[1] - 1, 0, -1):
+                state ^= state << np.uint32(13)
+                state ^= state >> np.uint32(17)
+                state ^= state << np.uint32(5)
+                j = (state % np.uint32(i + 1)).astype(np.int64)
+                swapped = bag[rows, j]
+                bag[rows, j] = bag[:, i]
+                bag[:, i] = swapped
+            self.state[empty] = state
+            self.bag[empty] = bag
+            self.dealt[empty] = 0
+        which = np.nonzero(live)[0]
+        self.pieces[which] = self.bag[which, self.dealt[which]]
+        self.dealt[which] += 1
+    # the top row a piece with masks, its top row at top and leftmost column at left, falls to on one board, or -1 if it can't go there
+    def _fall(self, rows, masks, top, left):
+        shifted = [int(mask) << int(left) for mask in masks if mask]
+        y = top
+        while not any([int(rows[y + i]) & shifted[i] for i in range(len(shifted))]):
+            y += 1
+        return y - 1 if y > top else -1
+    # a column's top is how many rows down to the first one filled in it, so how many rows with nothing in that column above or in them
+    def _skyline(self):
+        above = np.bitwise_or.accumulate(self.rows, axis = 1)
+        for x in range(self.width):
+            self.tops[:, x] = ((above & (1 << x)) == 0).sum(axis = 1)
+    # places every live board's piece: rotations are rotation states, xs where the left of the piece's box goes (like Tetrimino.x,
+    # pulled back onto the board if it's off), ys the row the box drops straight down from (like Tetrimino.y, config.spawnY if not
+    # given, a kick while turning can move it), so an action is a Placement from bot.py
+    # returns the lines every board cleared and which boards are over, a board that's over stays as it is until it's reset
+    def step(self, rotations, xs, ys = None):
+        index = self.index
+        live = ~self.done
+        pieces = self.pieces
+        rotations = np.asarray(rotations, np.int64) & 3
+        widths = self.widths[pieces, rotations]
+        columns = np.clip(np.asarray(xs, np.int64) + self.lefts[pieces, rotations], 0, self.width - widths)
+        # the row the top of the piece lands on: as low as every column it covers lets it go
+        covered = np.minimum(columns[:, None] + np.arange(4), self.width - 1)
+        bottoms = self.bottoms[pieces, rotations]
+        landing = (np.take_along_axis(self.tops, covered, 1) - 1 - bottoms).min(axis = 1)
+        masks = self.masks[pieces, rotations]
+        # the skyline only tells where a piece dropped from above the stack lands, one that starts under an overhang falls from where
+        # it starts instead, and one that has no room there ends the game
+        start = (self.spawnY if ys is None else np.asarray(ys, np.int64)) + self.shapeTops[pieces, rotations]
+        under = np.nonzero(live & (landing < start))[0]
+        for i in under:
+            landing[i] = self._fall(self.rows[i], masks[i], start[i], columns[i])
+        blocked = landing < start
+        placing = live & ~blocked
+        for i in range(4):
+            rows = np.minimum(landing + i, self.height - 1)
+            self.rows[index, rows] |= np.where(placing, masks[:, i] << columns.astype(np.uint16), 0).astype(np.uint16)
+        # line clears, only on the boards that have a full row: the full rows are sorted to the top, in order, and emptied
+        body = self.rows[:, :-1]
+        full = body == self.full
+        cleared = full.sum(axis = 1)
+        clearing = np.nonzero(cleared)[0]
+        if len(clearing):
+            order = np.argsort(~full[clearing], axis = 1, kind = 'stable')
+            kept = np.take_along_axis(body[clearing], order, 1)
+            kept[np.arange(self.height - 1) < cleared[clearing, None]] = 0
+            self.rows[clearing, :-1] = kept
+        self.placed += placing
+        self.score += self.lineScores[cleared] * (self.level + 1)
+        self.lines += cleared
+        self.level = self.lines // self.linesPerLevel
+        self._skyline()
+        # the next piece, and the game is lost if the stack has reached row 1 in any column it appears in (checkIfLost)
+        self._deal(placing)
+        pieces = self.pieces
+        spawned = self.spawnX + self.lefts[pieces, 0]
+        reach = np.take_along_axis(self.tops, np.minimum(spawned[:, None] + np.arange(4), self.width - 1), 1) <= 1
+        lost = (reach & (np.arange(4) < self.widths[pieces, 0][:, None])).any(axis = 1)
+        self.done |= blocked | (placing & lost)
+        return cleared, self.done.copy()
+
+##########################################################################################################################
+# the parity check: plays boards games in the single board engine, each piece put where the bot's plan (odd boards, which go on long
+# enough to clear lines and go up levels) or a random placement it could reach (even boards) says, turning and sliding it with the
+# game's own moves and kicks and then hard dropping it, and the same placements through BatchEngine
+# returns how many pieces were compared and a description of every difference
+def parity(boards, pieces = 500):
+    rng = np.random.default_rng(0)
+    engine = BatchEngine(boards)
+    games = [Game(Config(), seed) for seed in range(boards)]
+    bot = Bot(Config())
+    compared = 0
+    differences = []
+    for n in range(pieces):
+        rotations = np.zeros(boards, np.int64)
+        xs = np.zeros(boards, np.int64)
+        ys = np.zeros(boards, np.int64)
+        playing = [not game.lost for game in games]
+        for i in range(boards):
+            game = games[i]
+            if not playing[i]:
+                continue
+            config = game.config
+            t1 = game.t1
+            if i % 2:
+                placement = bot.plan(game.playArea, t1)
+            else:
+                options = placements(game.playArea, t1.pieceType, t1.rotationState, t1.x, t1.y)
+                placement = options[rng.integers(len(options))]
+            for turn in range(placement.turns):
+                t1.rotateRight(config, game.playArea)
+            for shift in range(abs(placement.shift)):
+                if placement.shift < 0:
+                    t1.moveLeft(game.playArea)
+                else:
+                    t1.moveRight(config, game.playArea)
+            rotations[i] = t1.rotationState
+            xs[i] = t1.x
+            ys[i] = t1.y
+            t1.hardDrop(config, game.playArea)
+            game.step(0)
+        engine.step(rotations, xs, ys)
+        for i in range(boards):
+            game = games[i]
+            if not playing[i]:
+                continue
+            compared += 1
+            expected = (list(game.playArea.rows), game.linesCleared, game.score, game.lost, game.config.pieceTypes.index(game.t1.pieceType))
+            actual = (engine.rows[i].tolist(), int(engine.lines[i]), int(engine.score[i]), bool(engine.done[i]), int(engine.pieces[i]))
+            if expected[:4] != actual[:4] or (not game.lost and expected[4] != actual[4]):
+                differences.append("board %d piece %d: expected %s, got %s" % (i, n, expected, actual))
+        if not any(playing):
+            break
+    return compared, differences
+
+# board-steps per second with random actions, boards that are over are started again with new seeds
+def benchmark(boards, steps):
+    rng = np.random.default_rng(1)
+    engine = BatchEngine(boards)
+    seed = boards
+    lines = 0
+    start = time.perf_counter()
+    for n in range(steps):
+        cleared, done = engine.step(rng.integers(0, 4, boards), rng.integers(-2, engine.width, boards))
+        lines += int(cleared.sum())
+        over = np.nonzero(done)[0]
+        if len(over):
+            engine.reset(over, np.arange(seed, seed + len(over)))
+            seed += len(over)
+    elapsed = time.perf_counter() - start
+    return boards * steps / elapsed, lines, seed - boards
+
+# the same in the single board engine, one Game at a time, each piece turned, slid and hard dropped with the game's own moves
+def scalarBenchmark(steps):
+    rng = np.random.default_rng(1)
+    seed = 0
+    game = Game(Config(), seed)
+    turns = rng.integers(0, 4, steps).tolist()
+    shifts = rng.integers(-5, 6, steps).tolist()
+    start = time.perf_counter()
+    for n in range(steps):
+        config = game.config
+        t1 = game.t1
+        for turn in range(turns[n]):
+            t1.rotateRight(config, game.playArea)
+        for shift in range(abs(shifts[n])):
+            if shifts[n] < 0:
+                t1.moveLeft(game.playArea)
+            else:
+                t1.moveRight(config, game.playArea)
+        t1.hardDrop(config, game.playArea)
+        if not game.step(0):
+            seed += 1
+            game = Game(Config(), seed)
+    return steps / (time.perf_counter() - start)
+
+def option(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def main():
+    if '--parity' in sys.argv:
+        compared, differences = parity(int(option('--parity', 64)), int(option('--pieces', 500)))
+        for difference in differences[:10]:
+            print(difference)
+        print("%d pieces compared with the single board engine, %d differences" % (compared, len(differences)))
+        if differences:
+            sys.exit(1)
+        return
+    boards = int(option('--boards', 4096))
+    steps = int(option('--steps', 200))
+    rate, lines, restarts = benchmark(boards, steps)
+    print("%d boards x %d steps: %.0f board-steps/s, %d lines cleared, %d games started over" % (boards, steps, rate, lines, restarts))
+    scalar = scalarBenchmark(steps * 20)
+    print("single board engine: %.0f board-steps/s, the batch is %.0fx that" % (scalar, rate / scalar))
+
+if __name__ == '__main__':
+    main()
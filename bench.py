@@ -0,0 +1,226 @@
+# host side benchmark of the game loop: plays fixed button scripts through the game's hardware path (tetris/app.py) with the machine and ssd1306
+# stand-ins from host/, timing every phase of every frame, and saves the numbers so two runs can be compared
+# run with: python bench.py [--frames N] [--irq] [--thread] [--realtime] [--display i2c|spi] [--freq HZ] [--out results.json] [--compare old.json]
+# --display picks the bus the display is on (see readyDisplay in backends.py) and --freq its clock, both default to what Config has
+# --irq reads the buttons through the interrupt driven IrqInput instead of polling the pins
+# --thread flushes the display from a FlushThread (see flushthread.py) instead of in the loop, --realtime makes the I2C stand-in take as long
+# as the real bus would, which is what the thread is there to hide, at the end the panel is checked against the framebuffer
+# every script also reports how many memory blocks the loop left allocated and how many garbage collections ran (see gcstats.py)
+from array import array
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+
+import machine
+from tetris.engine import Config, Game
+from tetris.render import Renderer
+from tetris.backends import PinInput, readyDisplay
+from tetris.buttons import IrqInput
+from tetris.bot import Bot, BotInput
+from tetris.gcstats import GcMonitor
+from tetris.flushthread import FlushThread
+
+PHASES = ('buttons', 'logic', 'board', 'piece', 'show')
+
+# the button scripts, one string (or 0) per frame, built the same way every run
+def idleScript(frames):
+    return [0] * frames
+
+def mashScript(frames):
+    rng = random.Random(1)
+    buttons = [0, 0, 0, 'L', 'R', 'D', 'ML', 'MR', 'MD']
+    return [rng.choice(buttons) for i in range(frames)]
+
+# taps the piece over to a column, turns it now and then and hard drops it, the way a fast player would
+def dropScript(frames):
+    script = []
+    piece = 0
+    while len(script) < frames:
+        shift = piece % 9 - 4
+        if piece % 3 == 0:
+            script += ['MR', 0]
+        for i in range(abs(shift)):
+            script += ['L' if shift < 0 else 'R', 0]
+        script += ['MD', 0, 0]
+        piece += 1
+    return script[:frames]
+
+# the bot from tetris/bot.py playing the same seeded games runScript plays, what it pressed is the script, so unlike the others
+# it clears lines and clearLines gets timed too
+def botScript(frames):
+    config = Config()
+    script = []
+    seed = 0
+    while len(script) < frames:
+        game = Game(config, seed)
+        buttons = BotInput(game, Bot(config))
+        while len(script) < frames:
+            buttonPressed = buttons.poll()
+            script.append(buttonPressed)
+            if not game.step(buttonPressed):
+                break
+        seed += 1
+    return script
+
+SCRIPTS = (('idle', idleScript), ('mash', mashScript), ('drop', dropScript), ('bot', botScript))
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+# plays the script, starting a new game whenever one is lost, and returns the timings
+def runScript(script, irq = False, thread = False, display = None, freq = None):
+    config = Config()
+    if display:
+        config.display = display
+    if freq:
+        if config.display == 'spi':
+            config.spiFreq = freq
+        else:
+            config.i2cFreq = freq
+    if irq:
+        # scripted presses don't bounce, and the benchmark runs far faster than any debounce time
+        config.debounceMs = 0
+        buttons = IrqInput(config)
+    else:
+        buttons = PinInput()
+    conversion_factor, bus, oled = readyDisplay(config)
+    renderer = Renderer(oled, config)
+    flusher = FlushThread(renderer) if thread else None
+    seed = 0
+    game = Game(config, seed)
+    # the timings go into arrays made up front, so storing them doesn't show up as allocations
+    timings = dict([(phase, array('q', [0] * len(script))) for phase in PHASES])
+    frame = 0
+    pieces = 0
+    lines = 0
+    clock = time.perf_counter_ns
+    monitor = GcMonitor()
+    start = clock()
+    for buttonPressed in script:
+        machine.setHeld(buttonPressed)
+        t0 = clock()
+        buttonPressed = buttons.poll()
+        t1 = clock()
+        if not game.step(buttonPressed):
+            pieces += game.piecesPlaced
+            lines += game.linesCleared
+            seed += 1
+            game = Game(config, seed)
+        if game.spawned:
+            renderer.invalidate()
+        t2 = clock()
+        if renderer.fullRedraw:
+            renderer.drawBoard(game.playArea)
+        t3 = clock()
+        renderer.drawPiece(game.t1)
+        t4 = clock()
+        if flusher:
+            flusher.flush()
+        else:
+            renderer.flush()
+        t5 = clock()
+        timings['buttons'][frame] = t1 - t0
+        timings['logic'][frame] = t2 - t1
+        timings['board'][frame] = t3 - t2
+        timings['piece'][frame] = t4 - t3
+        timings['show'][frame] = t5 - t4
+        frame += 1
+        monitor.sample()
+    elapsed = (clock() - start) / 1e9
+    monitor.stop()
+    if flusher:
+        flusher.stop()
+    pieces += game.piecesPlaced
+    lines += game.linesCleared
+    frames = len(script)
+    result = {
+        'frames': frames,
+        'seconds': elapsed,
+        'framesPerSecond': frames / elapsed,
+        'piecesPerSecond': pieces / elapsed,
+        'linesPerSecond': lines / elapsed,
+        'pieces': pieces,
+        'lines': lines,
+        'busBytesPerFrame': bus.bytesWritten / frames,
+        'busMillisecondsPerFrame': bus.busTime() * 1000 / frames,
+        'flushUs': renderer.flushTime(),
+        'flushMaxUs': renderer.flushMaxUs,
+        'allocated': monitor.allocated,
+        'allocatingFrames': monitor.allocatingFrames,
+        'collections': monitor.collections,
+        'panelMatches': oled.panel == oled.buffer,
+        'flushDropped': flusher.dropped if flusher else None,
+        'phases': {},
+    }
+    total = 0
+    for phase in PHASES:
+        values = timings[phase]
+        mean = sum(values) / len(values) / 1000
+        total += mean
+        result['phases'][phase] = {
+            'meanUs': mean,
+            'p50Us': percentile(values, 0.5) / 1000,
+            'p99Us': percentile(values, 0.99) / 1000,
+            'maxUs': max(values) / 1000,
+        }
+    result['frameUs'] = total
+    return result
+
+def report(name, result, old = None):
+    print("%s: %d frames, %.0f frames/s, %.1f pieces/s, %.1f lines/s, %.1f bus bytes/frame (%.2f ms/frame on the bus)" % (
+        name, result['frames'], result['framesPerSecond'], result['piecesPerSecond'], result['linesPerSecond'],
+        result['busBytesPerFrame'], result['busMillisecondsPerFrame']))
+    print("  flush %d us average, %d us worst per frame sent" % (result['flushUs'], result['flushMaxUs']))
+    if 'allocated' in result:
+        print("  %d blocks allocated in %d frames, %d garbage collections" % (result['allocated'], result['allocatingFrames'], result['collections']))
+    if 'panelMatches' in result:
+        line = "  panel %s the framebuffer" % ('matches' if result['panelMatches'] else 'DOES NOT MATCH')
+        if result['flushDropped'] is not None:
+            line += ", %d frames dropped by the flush thread" % result['flushDropped']
+        print(line)
+    for phase in PHASES:
+        numbers = result['phases'][phase]
+        line = "  %-8s mean %8.2f us  p50 %8.2f us  p99 %8.2f us  max %9.2f us" % (phase, numbers['meanUs'], numbers['p50Us'], numbers['p99Us'], numbers['maxUs'])
+        if old and phase in old['phases'] and old['phases'][phase]['meanUs']:
+            line += "  (%+.0f%%)" % ((numbers['meanUs'] / old['phases'][phase]['meanUs'] - 1) * 100)
+        print(line)
+    if old:
+        # results saved before the display could be picked only had I2C
+        oldBytes = old.get('busBytesPerFrame', old.get('i2cBytesPerFrame'))
+        print("  %-8s mean %8.2f us  (%+.0f%%), bus bytes/frame %+.1f" % ('frame', result['frameUs'], (result['frameUs'] / old['frameUs'] - 1) * 100,
+            result['busBytesPerFrame'] - oldBytes))
+
+def option(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def main():
+    frames = int(option('--frames', 3000))
+    out = option('--out', 'bench_output.json')
+    compare = option('--compare', None)
+    old = None
+    if compare:
+        with open(compare) as f:
+            old = json.load(f)
+    irq = '--irq' in sys.argv
+    thread = '--thread' in sys.argv
+    display = option('--display', None)
+    freq = int(option('--freq', 0))
+    machine.setRealtime('--realtime' in sys.argv)
+    results = {'time': time.time(), 'python': sys.version.split()[0], 'irq': irq, 'thread': thread, 'realtime': machine.realtime,
+        'display': display or Config().display, 'freq': freq or None, 'scripts': {}}
+    for name, build in SCRIPTS:
+        results['scripts'][name] = runScript(build(frames), irq, thread, display, freq)
+        report(name, results['scripts'][name], old and old['scripts'].get(name))
+    with open(out, 'w') as f:
+        json.dump(results, f, indent = 1)
+    print("saved to", out)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# host side benchmark comparing the bitboard Area against the original list of lists Area
+# run with: python bench_board.py
+import random
+import sys
+import time
+from tetris.board import Area
+
+HEIGHT = 22
+WIDTH = 10
+ROUNDS = 20000
+
+# the Area this game used before board.py, kept here only as a point of comparison
+class ListArea(object):
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.array = [[False for j in range(width)] for i in range(height)]
+        for i in range(width):
+            self.array[height - 1][i] = True
+    def collides(self, cells):
+        for x, y in cells:
+            if self.array[y][x]:
+                return True
+        return False
+    def lock(self, cells):
+        for x, y in cells:
+            self.array[y][x] = True
+    def clearLines(self):
+        linesCleared = 0
+        for i in range(self.height - 1):
+            if all(self.array[i]):
+                for j in range(self.width):
+                    self.array[i][j] = False
+                for k in reversed(range(i)):
+                    for j in range(self.width):
+                        self.array[k + 1][j] = self.array[k][j]
+                linesCleared += 1
+        return linesCleared
+
+# a T piece as cells and as row masks, probed at every column
+def pieceCells(x, y):
+    return ((x, y), (x - 1, y), (x, y - 1), (x + 1, y))
+
+def pieceMasks(x):
+    return [0b010 << (x - 1), 0b111 << (x - 1)]
+
+# how far down the highest cell of each of its columns is, which is how the game locks a piece (see Shape.heads)
+PIECE_HEADS = (1, 0, 1)
+
+# the same stack for both areas: the bottom rows filled except for one gap so probes have something to hit
+def fillBoth(listArea, bitArea, rng):
+    for y in range(12, HEIGHT - 1):
+        gap = rng.randrange(WIDTH)
+        for x in range(WIDTH):
+            if x != gap:
+                listArea.array[y][x] = True
+                bitArea.rows[y] |= 1 << x
+
+def fillFull(listArea, bitArea):
+    for y in range(HEIGHT - 5, HEIGHT - 1):
+        for x in range(WIDTH):
+            listArea.array[y][x] = True
+    bitArea.lock(HEIGHT - 5, [bitArea.full] * 4)
+
+def timeIt(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def report(name, oldTime, newTime):
+    print("%-12s list %8.1f ms   bitboard %8.1f ms   speedup %5.1fx" % (name, oldTime * 1000, newTime * 1000, oldTime / newTime))
+
+def main():
+    rng = random.Random(1)
+    listArea = ListArea(HEIGHT, WIDTH)
+    bitArea = Area(HEIGHT, WIDTH)
+    fillBoth(listArea, bitArea, rng)
+
+    def listProbe():
+        for i in range(ROUNDS):
+            for y in range(1, HEIGHT - 1):
+                listArea.collides(pieceCells(1 + i % 8, y))
+    def bitProbe():
+        for i in range(ROUNDS):
+            masks = pieceMasks(1 + i % 8)
+            for y in range(0, HEIGHT - 2):
+                bitArea.collides(y, masks)
+    report("collision", timeIt(listProbe), timeIt(bitProbe))
+
+    # four full rows cleared at once (a tetris), rebuilt every round
+    def listClear():
+        for i in range(ROUNDS // 10):
+            fillFull(listArea, bitArea)
+            listArea.clearLines()
+    def bitClear():
+        for i in range(ROUNDS // 10):
+            fillFull(listArea, bitArea)
+            bitArea.clearLines()
+    fillTime = timeIt(lambda: [fillFull(listArea, bitArea) for i in range(ROUNDS // 10)])
+    report("line clear", timeIt(listClear) - fillTime, timeIt(bitClear) - fillTime)
+
+    # locking a piece that completes no row, then checking for full rows like the game does after every piece
+    def listLock():
+        for i in range(ROUNDS):
+            listArea.lock(pieceCells(4, 2))
+            listArea.clearLines()
+    def bitLock():
+        for i in range(ROUNDS):
+            bitArea.lock(1, pieceMasks(1), 3, PIECE_HEADS)
+            bitArea.clearLines()
+    report("lock+check", timeIt(listLock), timeIt(bitLock))
+
+    listBytes = sys.getsizeof(listArea.array) + sum([sys.getsizeof(row) for row in listArea.array])
+    bitBytes = sys.getsizeof(bitArea.rows)
+    print("board storage: list %d bytes, bitboard %d bytes" % (listBytes, bitBytes))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# builds the game ahead of time for the Pico: every module of the tetris package is compiled to .mpy bytecode with mpy-cross, so the Pico
+# loads it at boot instead of compiling the source, which is most of the time before the first frame (the game prints how long that took)
+# run with: python build.py [--out build] [--arch armv6m]
+# then copy what's in the output folder (main.py and tetris/) onto the Pico in place of the sources
+# mpy-cross comes from pip (pip install mpy-cross) or a MicroPython build on the PATH, and has to make the .mpy version the firmware takes
+# to go further and freeze the game into the firmware itself, build MicroPython with manifest.py
+import os
+import shutil
+import subprocess
+import sys
+
+def option(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def findMpyCross():
+    found = shutil.which('mpy-cross')
+    if found:
+        return [found]
+    try:
+        import mpy_cross
+    except ImportError:
+        raise SystemExit("mpy-cross isn't installed: pip install mpy-cross, or put MicroPython's mpy-cross on the PATH")
+    mpy_cross.fix_perms()
+    return [mpy_cross.mpy_cross]
+
+def main():
+    out = option('--out', 'build')
+    arch = option('--arch', 'armv6m')
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = findMpyCross()
+    os.makedirs(os.path.join(out, 'tetris'), exist_ok = True)
+    sourceBytes = 0
+    builtBytes = 0
+    for name in sorted(os.listdir(os.path.join(here, 'tetris'))):
+        if not name.endswith('.py'):
+            continue
+        source = os.path.join(here, 'tetris', name)
+        built = os.path.join(out, 'tetris', name[:-3] + '.mpy')
+        # -s is the name tracebacks show
+        subprocess.check_call(command + ['-march=' + arch, '-s', 'tetris/' + name, '-o', built, source])
+        sourceBytes += os.path.getsize(source)
+        builtBytes += os.path.getsize(built)
+        print("%-30s %6d -> %6d bytes" % ('tetris/' + name, os.path.getsize(source), os.path.getsize(built)))
+    # the Pico only runs main.py as source, it's kept small for that
+    shutil.copy(os.path.join(here, 'main.py'), os.path.join(out, 'main.py'))
+    print("%d bytes of source compiled to %d bytes of bytecode in %s" % (sourceBytes, builtBytes, out))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# host side self-play evaluator: plays batches of seeded headless games across a pool of processes, one game per job, and
+# writes each game's numbers to a file the moment it finishes, while keeping only running totals in memory for the report
+# run with: python evaluate.py [--games N] [--workers N] [--maxFrames N] [--mash] [--out results.jsonl] [--sweep name=a,b,c ...]
+# --sweep tries every value of a Config attribute (das=100,160,220) or a bot weight (holes=-0.3,-0.5), several sweeps try every combination,
+# and every combination plays the same seeds so they're compared on the same pieces
+# --mash plays with headless.py's button masher instead of the bot
+import json
+import multiprocessing
+import os
+import sys
+import time
+from tetris.engine import Config, Game
+from tetris.bot import Bot, BotInput
+from headless import MashInput
+
+# makes a Config with params applied, names that aren't Config attributes are bot weights
+def makeConfig(params):
+    config = Config()
+    config.botWeights = dict(config.botWeights)
+    for name in params:
+        if hasattr(config, name):
+            setattr(config, name, params[name])
+        elif name in config.botWeights:
+            config.botWeights[name] = params[name]
+        else:
+            raise ValueError("%s is neither a Config attribute nor a bot weight" % name)
+    return config
+
+# why a game ended: block out is a new piece appearing on top of the stack, top out is the stack reaching the rows pieces appear in,
+# frame limit is the game still going at maxFrames
+def endCause(game):
+    if not game.lost:
+        return 'frame limit'
+    for block in game.t1.blocks:
+        if game.playArea.filled(block.x, block.y):
+            return 'block out'
+    return 'top out'
+
+# the step time histograms are dicts of whole microseconds to counts, so they stay small and merge by adding
+def percentileFromHistogram(histogram, fraction):
+    total = sum(histogram.values())
+    target = total * fraction
+    count = 0
+    for us in sorted(histogram):
+        count += histogram[us]
+        if count >= target:
+            return us
+    return 0
+
+# plays one game, this is what runs in the worker processes
+def playOne(job):
+    index, seed, params, bot, maxFrames = job
+    config = makeConfig(params)
+    game = Game(config, seed)
+    buttons = BotInput(game, Bot(config)) if bot else MashInput(seed)
+    histogram = {}
+    clock = time.perf_counter_ns
+    start = clock()
+    while game.frame < maxFrames:
+        t0 = clock()
+        going = game.step(buttons.poll())
+        us = (clock() - t0) // 1000
+        histogram[us] = histogram.get(us, 0) + 1
+        if not going:
+            break
+    return {
+        'combination': index,
+        'params': params,
+        'seed': seed,
+        'lines': game.linesCleared,
+        'pieces': game.piecesPlaced,
+        'frames': game.frame,
+        'level': game.level,
+        'end': endCause(game),
+        'seconds': (clock() - start) / 1e9,
+        'stepUs': {'p50': percentileFromHistogram(histogram, 0.5), 'p99': percentileFromHistogram(histogram, 0.99), 'max': max(histogram)},
+        'histogram': histogram,
+    }
+
+# running totals for one combination of parameters, everything needed for the report without keeping the games
+class Totals(object):
+    def __init__(self, params):
+        self.params = params
+        self.games = 0
+        self.lines = 0
+        self.linesSquared = 0
+        self.minLines = None
+        self.maxLines = 0
+        self.pieces = 0
+        self.frames = 0
+        self.ends = {}
+        self.histogram = {}
+    def add(self, result):
+        lines = result['lines']
+        self.games += 1
+        self.lines += lines
+        self.linesSquared += lines * lines
+        if self.minLines is None or lines < self.minLines:
+            self.minLines = lines
+        self.maxLines = max(self.maxLines, lines)
+        self.pieces += result['pieces']
+        self.frames += result['frames']
+        self.ends[result['end']] = self.ends.get(result['end'], 0) + 1
+        for us in result['histogram']:
+            self.histogram[us] = self.histogram.get(us, 0) + result['histogram'][us]
+    def summary(self):
+        mean = self.lines / self.games
+        return {
+            'params': self.params,
+            'games': self.games,
+            'meanLines': mean,
+            'stdevLines': max(0, self.linesSquared / self.games - mean * mean) ** 0.5,
+            'minLines': self.minLines,
+            'maxLines': self.maxLines,
+            'meanPieces': self.pieces / self.games,
+            'meanFrames': self.frames / self.games,
+            'ends': self.ends,
+            'stepUs': {
+                'p50': percentileFromHistogram(self.histogram, 0.5),
+                'p90': percentileFromHistogram(self.histogram, 0.9),
+                'p99': percentileFromHistogram(self.histogram, 0.99),
+                'max': max(self.histogram),
+            },
+        }
+
+def parseValue(text):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+# every combination of the --sweep values, as a list of dicts
+def combinations(sweeps):
+    result = [{}]
+    for name, values in sweeps:
+        result = [dict(params, **{name: value}) for params in result for value in values]
+    return result
+
+# the jobs are made as the pool asks for them, seeds go round the combinations so every combination gets results from early on
+def jobs(combos, games, bot, maxFrames):
+    for seed in range(games):
+        for index in range(len(combos)):
+            yield (index, seed, combos[index], bot, maxFrames)
+
+def option(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def main():
+    games = int(option('--games', 100))
+    workers = int(option('--workers', os.cpu_count() or 1))
+    maxFrames = int(option('--maxFrames', 20000))
+    out = option('--out', 'evaluate_output.jsonl')
+    bot = '--mash' not in sys.argv
+    sweeps = []
+    for i in range(len(sys.argv)):
+        if sys.argv[i] == '--sweep':
+            name, values = sys.argv[i + 1].split('=')
+            sweeps.append((name, [parseValue(value) for value in values.split(',')]))
+    combos = combinations(sweeps)
+    # catch a misspelt name before starting any processes
+    for params in combos:
+        makeConfig(params)
+    totals = [Totals(params) for params in combos]
+    total = games * len(combos)
+    done = 0
+    start = time.perf_counter()
+    with open(out, 'w') as f, multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(playOne, jobs(combos, games, bot, maxFrames), chunksize = 2):
+            totals[result['combination']].add(result)
+            del result['histogram']
+            f.write(json.dumps(result) + '\n')
+            f.flush()
+            done += 1
+            if done % 50 == 0 or done == total:
+                elapsed = time.perf_counter() - start
+                print("%d/%d games, %.1f games/s" % (done, total, done / elapsed), file = sys.stderr)
+    elapsed = time.perf_counter() - start
+    summaries = [t.summary() for t in totals]
+    print("%d games on %d workers in %.1f s: %.1f games/s" % (total, workers, elapsed, total / elapsed))
+    for summary in sorted(summaries, key = lambda s: -s['meanLines']):
+        print("%s: lines %.1f +- %.1f (%d to %d), pieces %.1f, frames %.0f, step p50 %d us p99 %d us max %d us, %s" % (
+            json.dumps(summary['params']), summary['meanLines'], summary['stdevLines'], summary['minLines'], summary['maxLines'],
+            summary['meanPieces'], summary['meanFrames'], summary['stepUs']['p50'], summary['stepUs']['p99'], summary['stepUs']['max'],
+            ', '.join('%s %d' % (end, count) for end, count in sorted(summary['ends'].items()))))
+    summaryFile = os.path.splitext(out)[0] + '.summary.json'
+    with open(summaryFile, 'w') as f:
+        json.dump({'time': time.time(), 'games': games, 'workers': workers, 'bot': bot, 'maxFrames': maxFrames, 'seconds': elapsed,
+            'combinations': summaries}, f, indent = 1)
+    print("games written to %s, summary to %s" % (out, summaryFile))
+
+if __name__ == '__main__':
+    main()
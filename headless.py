@@ -0,0 +1,53 @@
+# runs seeded games on the host with no hardware attached, as fast as the engine will go
+# run with: python headless.py [games] [--render] [--bot]
+# --bot has the bot play (see bot.py) instead of a button masher, which makes for long games, so it's a good load generator
+import random
+import sys
+import time
+from tetris.engine import Config, Game
+from tetris.render import Renderer
+from tetris.backends import MemoryDisplay
+from tetris.bot import Bot, BotInput
+
+BUTTONS = [0, 0, 0, 'L', 'R', 'D', 'ML', 'MR', 'MD']
+
+# a player that mashes buttons, the same seed always mashes the same ones
+class MashInput(object):
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+    def poll(self):
+        return BUTTONS[int(self.rng.random() * len(BUTTONS))]
+
+# plays one game to the end (or to maxFrames) and returns its final state
+def playGame(seed, render = False, maxFrames = 20000, bot = False):
+    config = Config()
+    game = Game(config, seed)
+    if bot:
+        buttons = BotInput(game, Bot(config))
+    else:
+        buttons = MashInput(seed)
+    renderer = Renderer(MemoryDisplay(config.displayWidth, config.displayHeight), config) if render else None
+    while game.frame < maxFrames and game.step(buttons.poll()):
+        if renderer:
+            if game.spawned:
+                renderer.invalidate()
+            renderer.draw(game.playArea, game.t1)
+            renderer.flush()
+    return game.state()
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 1000
+    render = '--render' in sys.argv
+    bot = '--bot' in sys.argv
+    start = time.perf_counter()
+    frames = 0
+    lines = 0
+    for seed in range(games):
+        state = playGame(seed, render, bot = bot)
+        frames += state['frame']
+        lines += state['linesCleared']
+    elapsed = time.perf_counter() - start
+    print("%d games, %d frames, %d lines in %.2f s: %.0f games/s, %.0f frames/s" % (games, frames, lines, elapsed, games / elapsed, frames / elapsed))
+
+if __name__ == '__main__':
+    main()
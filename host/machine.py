@@ -0,0 +1,119 @@
+import time
+
+# stand-in for MicroPython's machine module so the game's hardware path (tetris/app.py) runs on a computer
+# only the parts the game uses are here: Pin reads the buttons from held, and I2C and SPI count what would have gone over the bus (and with setRealtime() take as long as it would)
+
+# held is the buttons being held down right now, in the same letters checkButtons uses, whoever drives the stand-in sets it
+# with setHeld() every frame (setting it directly works for polled pins but fires no interrupts)
+held = ''
+# which button each of the game's pins is wired to, see PinInput
+PIN_BUTTONS = {0: 'D', 1: 'L', 2: 'R', 3: 'M'}
+# every pin with an interrupt handler, so setHeld() can call the handlers of the ones that changed
+irqPins = []
+# realtime makes every I2C transfer take as long as it would on the bus, set it with setRealtime()
+realtime = False
+
+def setHeld(buttons):
+    global held
+    old = held
+    held = buttons or ''
+    for pin in irqPins:
+        if (pin.button in old) != (pin.button in held):
+            pin.handler(pin)
+
+# a button that bounces: its pin flips count times before settling where setHeld() leaves it, each flip firing the handler
+def bounce(button, count):
+    global held
+    for i in range(count):
+        if button in held:
+            held = held.replace(button, '')
+        else:
+            held += button
+        for pin in irqPins:
+            if pin.button == button:
+                pin.handler(pin)
+
+def setRealtime(on):
+    global realtime
+    realtime = on
+
+class Pin(object):
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+    def __init__(self, id, mode = -1, pull = -1):
+        self.id = id
+        self.button = PIN_BUTTONS.get(id)
+        self.handler = None
+        # a new Pin on the same number takes over its interrupt, like on the Pico
+        for pin in irqPins:
+            if pin.id == id:
+                irqPins.remove(pin)
+                break
+    def irq(self, handler = None, trigger = IRQ_FALLING | IRQ_RISING, hard = False):
+        self.handler = handler
+        if handler and self not in irqPins:
+            irqPins.append(self)
+    # pulled up, so a held button reads 0
+    def value(self, value = None):
+        if value is not None:
+            return
+        if self.button and self.button in held:
+            return 0
+        return 1
+    # the SPI display driver sets its dc, res and cs pins up and drives them, which goes nowhere here
+    def init(self, mode = -1, pull = -1, value = None):
+        pass
+    def __call__(self, value = None):
+        return self.value(value)
+
+class I2C(object):
+    def __init__(self, id, scl = None, sda = None, freq = 400000):
+        self.freq = freq
+        # bytesWritten counts every byte sent, the address byte of each transfer included
+        self.bytesWritten = 0
+        self.transfers = 0
+    def writeto(self, addr, buf, stop = True):
+        self.bytesWritten += 1 + len(buf)
+        self.transfers += 1
+        self._wait(1 + len(buf))
+        return len(buf)
+    def writevto(self, addr, vector, stop = True):
+        count = 1
+        for buf in vector:
+            count += len(buf)
+        self.bytesWritten += count
+        self.transfers += 1
+        self._wait(count)
+    def _wait(self, count):
+        if realtime:
+            time.sleep(count * 9 / self.freq)
+    # how long the bytes written so far would have taken on the bus, 9 clocks per byte
+    def busTime(self):
+        return self.bytesWritten * 9 / self.freq
+
+class SPI(object):
+    def __init__(self, id, baudrate = 1000000, polarity = 0, phase = 0, sck = None, mosi = None, miso = None):
+        self.baudrate = baudrate
+        # bytesWritten counts every byte clocked out, there's no address or control byte on SPI
+        self.bytesWritten = 0
+        self.transfers = 0
+    def init(self, baudrate = 1000000, polarity = 0, phase = 0):
+        self.baudrate = baudrate
+    def write(self, buf):
+        self.bytesWritten += len(buf)
+        self.transfers += 1
+        if realtime:
+            time.sleep(len(buf) * 8 / self.baudrate)
+    # how long the bytes written so far would have taken on the bus, 8 clocks per byte
+    def busTime(self):
+        return self.bytesWritten * 8 / self.baudrate
+
+class ADC(object):
+    def __init__(self, pin):
+        self.pin = pin
+    def read_u16(self):
+        return 0
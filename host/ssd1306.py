@@ -0,0 +1,56 @@
+# stand-in for the ssd1306 driver: drawing goes to the in-memory display, and show(), write_cmd() and write_data()
+# send the same bytes to the I2C or SPI stand-in that the real driver would
+from tetris.backends import MemoryDisplay
+
+class SSD1306_I2C(MemoryDisplay):
+    def __init__(self, width, height, i2c, addr = 0x3C, external_vcc = False):
+        MemoryDisplay.__init__(self, width, height)
+        self.i2c = i2c
+        self.addr = addr
+        self.temp = bytearray(2)
+        self.write_list = [b'\x40', None]
+    def write_cmd(self, cmd):
+        self.temp[0] = 0x80
+        self.temp[1] = cmd
+        self.i2c.writeto(self.addr, self.temp)
+        MemoryDisplay.write_cmd(self, cmd)
+    def write_data(self, buf):
+        self.write_list[1] = buf
+        self.i2c.writevto(self.addr, self.write_list)
+        MemoryDisplay.write_data(self, buf)
+    def show(self):
+        self.write_cmd(0x21)
+        self.write_cmd(0)
+        self.write_cmd(self.width - 1)
+        self.write_cmd(0x22)
+        self.write_cmd(0)
+        self.write_cmd(self.pages - 1)
+        self.write_data(self.buffer)
+        self.shown += 1
+
+class SSD1306_SPI(MemoryDisplay):
+    def __init__(self, width, height, spi, dc, res, cs, external_vcc = False):
+        MemoryDisplay.__init__(self, width, height)
+        self.rate = 10 * 1024 * 1024
+        self.spi = spi
+        self.dc = dc
+        self.res = res
+        self.cs = cs
+    # like the real driver, every command is its own transfer
+    def write_cmd(self, cmd):
+        self.spi.init(baudrate = self.rate, polarity = 0, phase = 0)
+        self.spi.write(bytearray([cmd]))
+        MemoryDisplay.write_cmd(self, cmd)
+    def write_data(self, buf):
+        self.spi.init(baudrate = self.rate, polarity = 0, phase = 0)
+        self.spi.write(buf)
+        MemoryDisplay.write_data(self, buf)
+    def show(self):
+        self.write_cmd(0x21)
+        self.write_cmd(0)
+        self.write_cmd(self.width - 1)
+        self.write_cmd(0x22)
+        self.write_cmd(0)
+        self.write_cmd(self.pages - 1)
+        self.write_data(self.buffer)
+        self.shown += 1
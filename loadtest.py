@@ -0,0 +1,82 @@
+# host side load test of versus mode: plays many matches at once in one process, each two players (see tetris/versus.py) joined by
+# in-process queues or localhost sockets, as fast as the engines go, and reports how the protocol held up: messages per second, garbage
+# sent and the input to opponent latency, which with every match sharing one event loop is mostly how long a message waits for its turn
+# run with: python loadtest.py [--matches N] [--socket] [--mash] [--maxFrames N] [--realtime] [--port N]
+# --realtime runs every game on the step clock like on the Pico, instead of flat out
+# --mash plays with headless.py's button masher instead of the bot
+import asyncio
+import sys
+import time
+from tetris.engine import Config, Game
+from tetris.bot import Bot, BotInput
+from tetris.protocol import Latency
+from tetris.transports import queuePair, connectSocket, SocketServer
+from tetris.versus import Player
+from headless import MashInput
+
+def option(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+# both sides of a match are dealt the same pieces, each game has its own Config since a game changes its config as it goes
+def makePlayer(seed, side, transport, bot, realtime, maxFrames):
+    config = Config()
+    game = Game(config, seed)
+    buttons = BotInput(game, Bot(config)) if bot else MashInput(seed * 2 + side)
+    return Player(game, buttons, transport, realtime = realtime, maxFrames = maxFrames)
+
+async def playMatch(seed, transports, bot, realtime, maxFrames):
+    players = [makePlayer(seed, side, transports[side], bot, realtime, maxFrames) for side in range(2)]
+    await asyncio.gather(players[0].run(), players[1].run())
+    return players
+
+async def playAll(matches, socket, bot, realtime, maxFrames, port):
+    server = None
+    pairs = []
+    if socket:
+        server = await SocketServer(sharedClock = True).start('127.0.0.1', port)
+        for i in range(matches):
+            # one connection at a time, so the connection accepted is the one just made
+            near = await connectSocket('127.0.0.1', port, sharedClock = True)
+            pairs.append((near, await server.accept()))
+    else:
+        pairs = [queuePair() for i in range(matches)]
+    results = await asyncio.gather(*[playMatch(seed, pairs[seed], bot, realtime, maxFrames) for seed in range(matches)])
+    if server:
+        server.close()
+    return results
+
+def main():
+    matches = int(option('--matches', 50))
+    maxFrames = int(option('--maxFrames', 20000))
+    port = int(option('--port', 7654))
+    socket = '--socket' in sys.argv
+    realtime = '--realtime' in sys.argv
+    bot = '--mash' not in sys.argv
+    start = time.perf_counter()
+    results = asyncio.run(playAll(matches, socket, bot, realtime, maxFrames, port))
+    elapsed = time.perf_counter() - start
+    latency = Latency()
+    roundTrip = Latency()
+    messages = 0
+    rows = 0
+    frames = 0
+    outcomes = {}
+    for players in results:
+        outcome = '/'.join([player.result() for player in players])
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        for player in players:
+            latency.merge(player.latency)
+            roundTrip.merge(player.roundTrip)
+            messages += player.messagesSent
+            rows += player.rowsSent
+            frames += player.game.frame
+    print("%d matches over %s in %.1f s: %.0f messages/s, %.0f steps/s, %d rows of garbage sent" % (matches,
+        'localhost sockets' if socket else 'queues', elapsed, messages / elapsed, frames / elapsed, rows))
+    print("outcomes: " + ', '.join(['%s %d' % (outcome, count) for outcome, count in sorted(outcomes.items())]))
+    print("input to opponent: " + latency.report())
+    print("round trip: " + roundTrip.report())
+
+if __name__ == '__main__':
+    main()
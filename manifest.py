@@ -0,0 +1,6 @@
+# freezes the game into a MicroPython firmware build, so it runs from flash without being compiled at boot or taking up the heap:
+# make -C ports/rp2 BOARD=RPI_PICO FROZEN_MANIFEST=/path/to/this/manifest.py
+include("$(PORT_DIR)/boards/manifest.py")
+require("ssd1306")
+package("tetris")
+module("main.py")
@@ -0,0 +1,3 @@
+# the game as a package: engine.py (with board.py, pieces.py and bag.py) is the game itself and needs no hardware, render.py draws it,
+# backends.py and buttons.py are the display and input, app.py is the game loop the Pico runs, the rest are extras it can switch on
+# nothing is imported here, so importing one module doesn't pay for the others
@@ -0,0 +1,208 @@
+from tetris.engine import Config, Game, PROFILE
+from tetris.render import Renderer
+from tetris.backends import readyDisplay
+from tetris.buttons import IrqInput
+from tetris.scheduler import Scheduler, ticks_ms, ticks_diff, NATIVE
+
+# PROFILE (from engine.py, the one place it's set) times the phases of the loop as well as the game's (see profiler.py)
+# micropython only compiles out a const() in the module that declares it, so here each check is a global lookup, a few per pass
+# the extras (replays, the save, the bot, gc stats, the flush thread and the profiler) are only imported when they're switched on,
+# the Pico compiles every module it imports at boot, so one that's off would only hold up the first frame
+if PROFILE:
+    from tetris.profiler import BUTTONS, DRAW, SHOW
+
+##########################################################################################################################
+# CLASSES:
+# the parts of one pass of the game loop, shared by run() below and versus (see versus.py), which waits on asyncio instead:
+#   steps = loop.due(), then loop.step() that many times, then loop.show(), then wait loop.delay() ms, then loop.idle()
+# order of passing: config, game, buttons, renderer, recorder, monitor, flusher
+class GameLoop(object):
+    def __init__(self, config, game, buttons, renderer, recorder = None, monitor = None, flusher = None, realtime = True):
+        self.game = game
+        self.buttons = buttons
+        self.renderer = renderer
+        self.recorder = recorder
+        self.monitor = monitor
+        self.flusher = flusher
+        self.profiler = game.profiler
+        # without realtime there's no clock: every pass is one step and a frame, as fast as the caller goes
+        self.scheduler = Scheduler(config) if realtime else None
+        # quit is set once 'MDLR' has been held down
+        self.quit = False
+    # how many game steps are due, more than one if the last pass took a while
+    def due(self):
+        if self.scheduler:
+            return self.scheduler.dueSteps(ticks_ms())
+        return 1
+    # one game step, returns False once the game is lost or 'MDLR' has been held down
+    def step(self):
+        game = self.game
+        # poll buttons
+        if PROFILE:
+            started = self.profiler.start()
+        buttonPressed = self.buttons.poll()
+        if PROFILE:
+            self.profiler.record(BUTTONS, started)
+
+        # falling tetrimino
+        game.step(buttonPressed)
+        if self.recorder:
+            self.recorder.record(game, buttonPressed)
+        # the board only changes when a piece locks, so this is the only time everything gets redrawn
+        if game.spawned and self.renderer:
+            self.renderer.invalidate()
+        if buttonPressed == 'MDLR':
+            self.quit = True
+        return not (game.lost or self.quit)
+    # display, when a frame is due, only the pages that changed are sent (by the other core if there's a flusher)
+    def show(self):
+        renderer = self.renderer
+        if not renderer or (self.scheduler and not self.scheduler.frameDue(ticks_ms())):
+            return
+        if PROFILE:
+            started = self.profiler.start()
+        renderer.draw(self.game.playArea, self.game.t1)
+        if PROFILE:
+            self.profiler.record(DRAW, started)
+            started = self.profiler.start()
+        if self.flusher:
+            self.flusher.flush()
+        else:
+            renderer.flush()
+        if PROFILE:
+            self.profiler.record(SHOW, started)
+    # how many ms until the next step or frame is due
+    def delay(self):
+        if self.scheduler:
+            return self.scheduler.delay()
+        return 0
+    # after the wait
+    def idle(self):
+        if self.monitor:
+            self.monitor.sample()
+        # a summary of the timings every config.profileEveryMs, or when a key comes in over serial
+        if PROFILE and self.profiler.due(ticks_ms()):
+            self.profiler.dump(ticks_ms())
+
+##########################################################################################################################
+# FUNCTIONS:
+# runs the game loop until the game is lost or 'MDLR' is held down, returns the scheduler so its counters can be looked at
+def run(config, game, buttons, renderer, recorder = None, monitor = None, flusher = None):
+    loop = GameLoop(config, game, buttons, renderer, recorder, monitor, flusher)
+    scheduler = loop.scheduler
+    while not loop.quit:
+        steps = loop.due()
+        while steps and not loop.quit:
+            loop.step()
+            if game.lost:
+                print("you lose")
+                return scheduler
+            steps -= 1
+        loop.show()
+        # wait for whichever of the next step and the next frame comes first
+        scheduler.wait()
+        loop.idle()
+    return scheduler
+
+##########################################################################################################################
+# MAIN:
+# startedMs is the ticks_ms() main.py started at, so the time it takes to get the first frame up can be reported
+def main(startedMs = None):
+    # DEFINITIONS:
+    config = Config()
+    conversion_factor, bus, oled = readyDisplay(config)
+    renderer = Renderer(oled, config)
+    game = Game(config)
+    # a game left with 'MDLR' carries on where it was, the bot's demo games and versus matches don't touch the save
+    store = None
+    resumed = False
+    if config.saveFile and not config.demo and not config.versus:
+        from tetris.save import SaveStore
+        store = SaveStore(config, config.saveFile, config.saveSlots)
+        if store.load() and store.hasGame:
+            store.resume(game)
+            resumed = True
+        print("save loaded in %d us%s" % (store.loadUs, ", carrying on with the last game" if resumed else ""))
+    # in demo mode the bot plays by itself
+    if config.demo:
+        from tetris.bot import Bot, BotInput
+        buttons = BotInput(game, Bot(config))
+    else:
+        buttons = IrqInput(config)
+    # NOT DEFINITIONS:
+    # the game's 20 tall, 10 wide (indices are different and weird)
+    # blocks are drawn within the bounds y = 3 to y = 57, x = 0 to x = 118
+
+    replayFile = None
+    recorder = None
+    # a replay starts from the seed, so a game picked up part way through isn't recorded, and it has no record of the garbage an
+    # opponent sends, so neither is a versus match
+    if config.replayFile and not resumed and not config.versus:
+        from tetris.replay import Recorder
+        replayFile = open(config.replayFile, 'wb')
+        recorder = Recorder(game, replayFile)
+
+    # the first frame goes up before the loop starts, which is where the time to get playing is measured
+    renderer.draw(game.playArea, game.t1)
+    renderer.flush()
+    shownMs = ticks_ms()
+    if NATIVE:
+        print("first frame %d ms after power on" % shownMs)
+    if startedMs is not None:
+        print("first frame %d ms after main.py started" % ticks_diff(shownMs, startedMs))
+
+    monitor = None
+    if config.gcStats:
+        from tetris.gcstats import GcMonitor
+        monitor = GcMonitor()
+
+    # the flush thread needs the driver's write_cmd/write_data, like partial flushes do
+    flusher = None
+    if config.dualCore and renderer.partial:
+        from tetris.flushthread import FlushThread
+        flusher = FlushThread(renderer)
+
+    # versus runs the same loop on asyncio, alongside the link to the other Pico, it's only imported when it's played so asyncio doesn't
+    # add to every boot
+    player = None
+    if config.versus:
+        from tetris.versus import playVersus
+        player = playVersus(config, game, buttons, renderer, monitor, flusher)
+        scheduler = player.loop.scheduler
+    else:
+        scheduler = run(config, game, buttons, renderer, recorder, monitor, flusher)
+
+    # off button was pressed or the game was lost, while loop was ended:
+    if recorder:
+        recorder.close(game)
+        replayFile.close()
+    if flusher:
+        flusher.stop()
+    oled.poweroff()
+    # a lost game goes into the high scores, one left with 'MDLR' is saved to carry on with
+    if store:
+        if game.lost:
+            place = store.addScore(game)
+            store.save()
+            if place >= 0:
+                print("new high score, number %d" % (place + 1))
+        else:
+            store.save(game)
+        print("saved in %d us" % store.saveUs)
+        for score, lines, level in store.highScores:
+            print("%8d  %4d lines  level %d" % (score, lines, level))
+    if player:
+        print(player.report())
+    print(game.linesCleared, "lines,", game.score, "points")
+    print("bytes per frame:", renderer.bytesPerFrame())
+    print("flush time on %s: %d us average, %d us worst over %d frames" % (config.display, renderer.flushTime(), renderer.flushMaxUs, renderer.flushes))
+    print("frames skipped:", scheduler.skippedFrames)
+    if flusher:
+        print("flush thread: %d frames sent, %d dropped while it was busy" % (flusher.flushed, flusher.dropped))
+    if not config.demo:
+        print("input latency: %d ms average, %d ms worst" % (buttons.averageLatency(), buttons.latencyMax))
+    if monitor:
+        monitor.stop()
+        print(monitor.report())
+    if PROFILE:
+        print(game.profiler.summary())
@@ -0,0 +1,245 @@
+# everything the game needs from the outside world, in one real version for the Pico and stand-ins for running without hardware
+# input backends have poll(), which returns the buttons held down in the same form as checkButtons
+# display backends look like the ssd1306 driver's SSD1306_I2C, so the Renderer can draw to any of them
+
+##########################################################################################################################
+# INPUT:
+# 'L' is left, 'R' is right, 'D' is (soft) drop, 'M' is modifier (ML is rotate left, MR is rotate right, MD is hard drop)
+# every combination of held buttons as a bitmask (M is 8, D is 4, L is 2, R is 1) and the string it reads as, built once so reading the buttons builds no strings
+BUTTON_BITS = (('M', 8), ('D', 4), ('L', 2), ('R', 1))
+BUTTON_COMBOS = tuple([''.join([name for name, bit in BUTTON_BITS if mask & bit]) or 0 for mask in range(16)])
+BUTTON_MASKS = dict([(BUTTON_COMBOS[mask], mask) for mask in range(16)])
+
+def checkButtons(dropButton, leftButton, rightButton, modifyButton):
+    mask = 0
+    if modifyButton.value() != 1:
+        mask |= 8
+    if dropButton.value() != 1:
+        mask |= 4
+    if leftButton.value() != 1:
+        mask |= 2
+    if rightButton.value() != 1:
+        mask |= 1
+    return BUTTON_COMBOS[mask]
+
+# the four buttons wired to the Pico, machine is only imported when this is used
+class PinInput(object):
+    def __init__(self):
+        from machine import Pin
+        self.dropButton = Pin(0, Pin.IN, Pin.PULL_UP) # k2
+        self.leftButton = Pin(1, Pin.IN, Pin.PULL_UP) # k0
+        self.rightButton = Pin(2, Pin.IN, Pin.PULL_UP) # k1
+        self.modifyButton = Pin(3, Pin.IN, Pin.PULL_UP) # k3
+    def poll(self):
+        return checkButtons(self.dropButton, self.leftButton, self.rightButton, self.modifyButton)
+
+# plays back a list of button strings, one per frame, and then nothing once the list runs out
+class ScriptInput(object):
+    def __init__(self, script):
+        self.script = script
+        self.index = 0
+    def poll(self):
+        if self.index >= len(self.script):
+            return 0
+        buttonPressed = self.script[self.index]
+        self.index += 1
+        return buttonPressed
+
+# no buttons are ever pressed
+class NullInput(object):
+    def poll(self):
+        return 0
+
+##########################################################################################################################
+# DISPLAY:
+# config.display picks the display: 'i2c' and 'spi' are an SSD1306 on that bus, 'png' and 'terminal' are the computer stand-ins below,
+# 'memory' is a MemoryDisplay on its own, returns the bus alongside the display (None when there isn't one)
+def readyDisplay(config):
+    displayWidth = config.displayWidth
+    displayHeight = config.displayHeight
+
+    #fb = framebuf.FrameBuffer(buffer, 128, 64, framebuf.MONO_HLSB)
+
+    conversion_factor = 3.3 / (65535) # Conversion from Pin read to proper voltage
+
+    bus = None
+    if config.display == 'i2c':
+        from machine import Pin, I2C
+        from ssd1306 import SSD1306_I2C
+        bus = I2C(config.i2cId, scl=Pin(config.i2cScl), sda=Pin(config.i2cSda), freq=config.i2cFreq)
+        oled = SSD1306_I2C(displayWidth, displayHeight, bus)
+    elif config.display == 'spi':
+        from machine import Pin, SPI
+        from ssd1306 import SSD1306_SPI
+        bus = SPI(config.spiId, baudrate=config.spiFreq, sck=Pin(config.spiSck), mosi=Pin(config.spiMosi))
+        oled = SSD1306_SPI(displayWidth, displayHeight, bus, Pin(config.spiDc), Pin(config.spiRes), Pin(config.spiCs))
+        # the driver sets the bus back to its own rate (10 MHz) before every transfer, rate is where it keeps it
+        oled.rate = config.spiFreq
+    elif config.display == 'png':
+        oled = PngDisplay(displayWidth, displayHeight, config.displayPath, config.displayEvery)
+    elif config.display == 'terminal':
+        oled = TerminalDisplay(displayWidth, displayHeight, config.displayEvery)
+    elif config.display == 'memory':
+        oled = MemoryDisplay(displayWidth, displayHeight)
+    else:
+        raise ValueError("unknown display %r" % config.display)
+
+    # clear screen
+    oled.fill(0)
+
+    return(conversion_factor, bus, oled)
+
+# an SSD1306 that only exists in memory: buffer is the framebuffer in the same layout as the real one (a byte is 8 pixels down a column,
+# a row of bytes is an 8 pixel page) and panel is what the screen would be showing after show() or the write_cmd/write_data windows
+class MemoryDisplay(object):
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pages = height // 8
+        self.buffer = bytearray(width * self.pages)
+        self.panel = bytearray(width * self.pages)
+        self.commands = []
+        self.window = (0, width - 1, 0, self.pages - 1)
+        self.column = 0
+        self.page = 0
+        self.shown = 0
+        self.on = True
+    def fill(self, color):
+        value = 255 if color else 0
+        for i in range(len(self.buffer)):
+            self.buffer[i] = value
+    def fill_rect(self, x, y, w, h, color):
+        x0 = max(x, 0)
+        x1 = min(x + w, self.width)
+        for row in range(max(y, 0), min(y + h, self.height)):
+            bit = 1 << (row & 7)
+            start = (row >> 3) * self.width
+            for i in range(start + x0, start + x1):
+                if color:
+                    self.buffer[i] |= bit
+                else:
+                    self.buffer[i] &= ~bit
+    # an outline, like framebuf's rect
+    def rect(self, x, y, w, h, color):
+        self.fill_rect(x, y, w, 1, color)
+        self.fill_rect(x, y + h - 1, w, 1, color)
+        self.fill_rect(x, y, 1, h, color)
+        self.fill_rect(x + w - 1, y, 1, h, color)
+    def pixel(self, x, y):
+        return (self.buffer[(y >> 3) * self.width + x] >> (y & 7)) & 1
+    def show(self):
+        self.panel[:] = self.buffer
+        self.shown += 1
+    # only the column and page address commands are understood, the rest are ignored
+    def write_cmd(self, cmd):
+        self.commands.append(cmd)
+        if self.commands[0] not in (0x21, 0x22):
+            self.commands = []
+        elif len(self.commands) == 3:
+            if self.commands[0] == 0x21:
+                self.window = (self.commands[1], self.commands[2], self.window[2], self.window[3])
+                self.column = self.commands[1]
+            else:
+                self.window = (self.window[0], self.window[1], self.commands[1], self.commands[2])
+                self.page = self.commands[1]
+            self.commands = []
+    def write_data(self, data):
+        x0, x1, page0, page1 = self.window
+        for value in data:
+            self.panel[self.page * self.width + self.column] = value
+            self.column += 1
+            if self.column > x1:
+                self.column = x0
+                self.page += 1
+                if self.page > page1:
+                    self.page = page0
+    def poweroff(self):
+        self.on = False
+
+# the computer stand-ins for looking at the game: the Renderer calls present() once a frame has been sent, and every every frames
+# they show the panel, PngDisplay by writing it to a numbered PNG in path, TerminalDisplay by printing it with block characters
+class PngDisplay(MemoryDisplay):
+    def __init__(self, width, height, path = 'frames', every = 1, scale = 4):
+        MemoryDisplay.__init__(self, width, height)
+        self.path = path
+        self.every = every
+        self.scale = scale
+        self.presented = 0
+        self.written = 0
+    def present(self):
+        self.presented += 1
+        if self.presented % self.every:
+            return
+        import os
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        with open(os.path.join(self.path, 'frame%05d.png' % self.written), 'wb') as f:
+            f.write(self.png())
+        self.written += 1
+    # the panel as an 8 bit greyscale PNG, scale pixels to a panel pixel, zlib and struct are all it takes
+    def png(self):
+        import struct
+        import zlib
+        scale = self.scale
+        on = b'\xff' * scale
+        off = b'\x00' * scale
+        rows = bytearray()
+        for y in range(self.height):
+            line = bytearray(b'\x00') # filter type none
+            start = (y >> 3) * self.width
+            bit = 1 << (y & 7)
+            for x in range(self.width):
+                line += on if self.panel[start + x] & bit else off
+            rows += line * scale
+        def chunk(kind, data):
+            return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+        header = struct.pack('>IIBBBBB', self.width * scale, self.height * scale, 8, 0, 0, 0, 0)
+        return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(bytes(rows))) + chunk(b'IEND', b'')
+
+# two panel rows to a line of text: upper half block, lower half block, full block or space, drawn over the last frame
+class TerminalDisplay(MemoryDisplay):
+    CHARACTERS = (' ', '\u2580', '\u2584', '\u2588')
+    def __init__(self, width, height, every = 1, out = None):
+        MemoryDisplay.__init__(self, width, height)
+        self.every = every
+        self.out = out
+        self.presented = 0
+    def present(self):
+        self.presented += 1
+        if self.presented % self.every:
+            return
+        import sys
+        out = self.out or sys.stdout
+        out.write('\x1b[H' + self.text() + '\n')
+        out.flush()
+    def text(self):
+        lines = []
+        for y in range(0, self.height, 2):
+            line = []
+            for x in range(self.width):
+                top = (self.panel[(y >> 3) * self.width + x] >> (y & 7)) & 1
+                bottom = (self.panel[((y + 1) >> 3) * self.width + x] >> ((y + 1) & 7)) & 1
+                line.append(self.CHARACTERS[top | bottom << 1])
+            lines.append(''.join(line))
+        return '\n'.join(lines)
+
+# a display that throws everything away
+class NullDisplay(object):
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.buffer = bytearray(width * height // 8)
+    def fill(self, color):
+        pass
+    def fill_rect(self, x, y, w, h, color):
+        pass
+    def rect(self, x, y, w, h, color):
+        pass
+    def show(self):
+        pass
+    def write_cmd(self, cmd):
+        pass
+    def write_data(self, data):
+        pass
+    def poweroff(self):
+        pass
@@ -0,0 +1,40 @@
+# the piece source: pieces are dealt in bags of one of every type, each bag shuffled all at once with the game's seeded rng, so the same seed
+# deals the same pieces everywhere and getting the next piece never has to retry
+# the pieces still to come wait in a ring buffer made once, holding the preview plus one whole bag, so looking ahead is just reading it
+class PieceBag(object):
+    def __init__(self, config, rng):
+        self.pieceTypes = config.pieceTypes
+        self.rng = rng
+        self.previewCount = config.previewCount
+        # bag is the order of the bag being shuffled, as indices into pieceTypes
+        self.bag = bytearray(range(len(self.pieceTypes)))
+        # queue holds pieceTypes indices, head is the next piece out and count how many are waiting
+        self.size = self.previewCount + 1 + len(self.bag)
+        self.queue = bytearray(self.size)
+        self.head = 0
+        self.count = 0
+        self._fill()
+    # shuffles new bags onto the end of the queue until there's a piece to deal plus a full preview behind it
+    def _fill(self):
+        bag = self.bag
+        while self.count <= self.previewCount:
+            # Fisher-Yates, from the last piece down
+            for i in range(len(bag) - 1, 0, -1):
+                j = self.rng.randrange(i + 1)
+                bag[i], bag[j] = bag[j], bag[i]
+            for i in range(len(bag)):
+                self.queue[(self.head + self.count) % self.size] = bag[i]
+                self.count += 1
+    # the type of the next piece, taking it out of the queue
+    def next(self):
+        index = self.queue[self.head]
+        self.head = (self.head + 1) % self.size
+        self.count -= 1
+        self._fill()
+        return self.pieceTypes[index]
+    # the type of the piece i places back in the queue, 0 is the one next() gives, there are always at least previewCount + 1 waiting
+    def peek(self, i):
+        return self.pieceTypes[self.queue[(self.head + i) % self.size]]
+    # the next n pieces in the order they'll come, as a list
+    def preview(self, n):
+        return [self.peek(i) for i in range(min(n, self.count))]
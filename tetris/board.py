@@ -0,0 +1,198 @@
+from array import array
+
+# play area is an object of this type:
+# every row is stored as an integer bitmask (bit x set means column x is filled), so a whole row can be tested, filled or moved in one operation
+# pieces are handed to the area as a top row plus a list of row masks, one mask per row the piece covers
+# 1 is the highest visible spot, 20 is the lowest visible spot, 21 (the maximum) is completely filled
+class Area(object):
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        # full is the mask of a completely filled row, leftWall and rightWall are the bits of the outermost columns
+        self.full = (1 << width) - 1
+        self.leftWall = 1
+        self.rightWall = 1 << (width - 1)
+        # 'H' holds 16 bits per row, which is plenty for a 10 wide board
+        self.rows = array('H', [0] * height)
+        self.rows[height - 1] = self.full # row of filled cells at the bottom
+        self.lockTop = 0
+        self.lockBottom = height - 2
+        # tops is the skyline: the highest filled row of every column (the floor's row for an empty one), kept up to date by lock() and
+        # clearLines(), so how far a piece can drop or whether the stack reached the top is one lookup per column
+        self.tops = array('b', [height - 1] * width)
+    # a copy with its own rows, for trying moves out without touching the real play area
+    def copy(self):
+        area = Area(self.height, self.width)
+        area.copyFrom(self)
+        return area
+    # makes this area the same as other in place, so one scratch area can be reused to try moves out (or to undo them) without allocating
+    def copyFrom(self, other):
+        self.rows[:] = other.rows
+        self.tops[:] = other.tops
+        self.lockTop = other.lockTop
+        self.lockBottom = other.lockBottom
+    # makes the stack rows (from a saved game), the skyline is worked out again from them and every row is checked at the next clear
+    def load(self, rows):
+        for y in range(self.height):
+            self.rows[y] = rows[y]
+        self.lockTop = 0
+        self.lockBottom = self.height - 2
+        self._skyline()
+    def filled(self, x, y):
+        return (self.rows[y] >> x) & 1
+    def update(self, block):
+        self.rows[block.y] |= 1 << block.x
+        if block.y < self.tops[block.x]:
+            self.tops[block.x] = block.y
+    # True if any of the row masks starting at row top overlap the stack or leave the board
+    # shift moves the masks right by that many columns first, so a piece's masks can be placed without building new ones
+    def collides(self, top, masks, shift = 0):
+        if top < 0 or top + len(masks) > self.height:
+            return self._collidesEdge(top, masks, shift)
+        rows = self.rows
+        for mask in masks:
+            if rows[top] & (mask << shift):
+                return True
+            top += 1
+        return False
+    def _collidesEdge(self, top, masks, shift):
+        for i in range(len(masks)):
+            y = top + i
+            if masks[i] and (y < 0 or y >= self.height or self.rows[y] & (masks[i] << shift)):
+                return True
+        return False
+    # how many rows the masks can fall from row top before they land on something
+    # with bottoms (see Shape) it's one skyline lookup per column, unless the piece is tucked under an overhang, which the skyline can't see past,
+    # then (or without bottoms) it's found by moving the masks down a row at a time
+    def dropDistance(self, top, masks, shift = 0, bottoms = None):
+        if bottoms is not None:
+            tops = self.tops
+            distance = self.height
+            for i in range(len(bottoms)):
+                room = tops[shift + i] - 1 - top - bottoms[i]
+                if room < distance:
+                    distance = room
+            if distance >= 0:
+                return distance
+        distance = 0
+        while not self.collides(top + distance + 1, masks, shift):
+            distance += 1
+        return distance
+    # True if the stack has reached row in any of the width columns starting at column left
+    def reaches(self, row, left, width):
+        tops = self.tops
+        for x in range(left, left + width):
+            if tops[x] <= row:
+                return True
+        return False
+    # lockTop and lockBottom remember which rows the last locked piece touched, only those can have become full
+    # with heads (see Shape) the skyline takes one compare per column, without it every set bit of every mask is looked at
+    def lock(self, top, masks, shift = 0, heads = None):
+        rows = self.rows
+        tops = self.tops
+        y = top
+        for mask in masks:
+            rows[y] |= mask << shift
+            if heads is None:
+                x = shift
+                while mask:
+                    if mask & 1 and y < tops[x]:
+                        tops[x] = y
+                    mask >>= 1
+                    x += 1
+            y += 1
+        if heads is not None:
+            x = shift
+            for head in heads:
+                if top + head < tops[x]:
+                    tops[x] = top + head
+                x += 1
+        self.lockTop = top
+        self.lockBottom = y - 1
+    # removes every full row in one pass from the bottom up, compacting the rest of the stack down over them
+    def clearLines(self):
+        rows = self.rows
+        full = self.full
+        bottom = min(self.lockBottom, self.height - 2)
+        for read in range(self.lockTop, bottom + 1):
+            if rows[read] == full:
+                break
+        else:
+            return 0
+        highest = read
+        write = bottom
+        for read in range(bottom, -1, -1):
+            row = rows[read]
+            if row != full:
+                if write != read:
+                    rows[write] = row
+                write -= 1
+        cleared = write + 1
+        while write >= 0:
+            rows[write] = 0
+            write -= 1
+        self.lockTop = 0
+        self.lockBottom = -1
+        # a full row has every column in it, so every top is at or above the highest one cleared: a top above it came down with the rows
+        # above it, a top that was cleared away is the first cell under where those rows ended up
+        tops = self.tops
+        start = highest + cleared
+        for x in range(self.width):
+            if tops[x] < highest:
+                tops[x] += cleared
+            else:
+                bit = 1 << x
+                y = start
+                while not rows[y] & bit:
+                    y += 1
+                tops[x] = y
+        return cleared
+    # pushes the stack up count rows and fills the rows it leaves with garbage: full rows with a hole in column hole
+    # returns True if any of the stack went off the top
+    def addGarbage(self, count, hole):
+        rows = self.rows
+        floor = self.height - 1
+        count = min(count, floor)
+        overflow = False
+        for y in range(count):
+            if rows[y]:
+                overflow = True
+        for y in range(count, floor):
+            rows[y - count] = rows[y]
+        garbage = self.full & ~(1 << hole)
+        for y in range(floor - count, floor):
+            rows[y] = garbage
+        # a garbage row is never full, so there's nothing for the next clear to look for
+        self.lockTop = 0
+        self.lockBottom = -1
+        self._skyline()
+        return overflow
+    # works the skyline out again from the rows, after garbage goes in or a saved game is loaded
+    def _skyline(self):
+        rows = self.rows
+        tops = self.tops
+        floor = self.height - 1
+        for x in range(self.width):
+            tops[x] = floor
+        left = self.full
+        for y in range(floor):
+            found = rows[y] & left
+            if found:
+                left &= ~found
+                x = 0
+                while found:
+                    if found & 1:
+                        tops[x] = y
+                    found >>= 1
+                    x += 1
+                if not left:
+                    break
+    def draw(self, oled, config):
+        for i in range(self.height - 1):
+            row = self.rows[i]
+            j = 0
+            while row:
+                if row & 1:
+                    oled.fill_rect(i * config.fallDistance - 3, config.gameWidth - 3 - j * config.fallDistance, config.size, config.size, 1)
+                row >>= 1
+                j += 1
@@ -0,0 +1,182 @@
+from tetris.board import Area
+from tetris.pieces import SHAPES, KICKS
+
+# the bot: for a piece it lists every place the piece can end up by turning, then sliding, then hard dropping,
+# scores the play area each of those would leave, and plays the best one by pressing the same buttons a player would
+
+# a place a piece can be dropped from: how many turns right and how many columns (negative is left) it takes to get there from where
+# the piece is, and the rotation state and box position it lands in
+class Placement(object):
+    def __init__(self, turns, shift, rotationState, x, y):
+        self.turns = turns
+        self.shift = shift
+        self.rotationState = rotationState
+        self.x = x
+        self.y = y
+
+def _fits(playArea, shape, x, y):
+    if x + shape.left < 0 or x + shape.right >= playArea.width:
+        return False
+    return not playArea.collides(y + shape.top, shape.masks, x + shape.left)
+
+# every placement of pieceType reachable from rotation state rotationState at x, y, by turning right (with the same kicks the game uses)
+# and then sliding sideways at that height, before dropping straight down
+def placements(playArea, pieceType, rotationState, x, y):
+    shapes = SHAPES[pieceType]
+    kicks = KICKS[pieceType][0]
+    result = []
+    seen = []
+    for turns in range(4):
+        if turns:
+            turned = (rotationState + 1) % 4
+            for kickX, kickY in kicks[rotationState]:
+                if _fits(playArea, shapes[turned], x + kickX, y - kickY):
+                    x += kickX
+                    y -= kickY
+                    rotationState = turned
+                    break
+            else:
+                break
+        shape = shapes[rotationState]
+        # the O looks the same every way round, and S, Z and I have states that land the same cells, so those are only tried once
+        if not _fits(playArea, shape, x, y) or (shape.masks, x + shape.left) in seen:
+            continue
+        for direction in (-1, 1):
+            shift = 0 if direction < 0 else 1
+            while _fits(playArea, shape, x + shift * direction, y):
+                landX = x + shift * direction
+                if (shape.masks, landX + shape.left) not in seen:
+                    seen.append((shape.masks, landX + shape.left))
+                    drop = playArea.dropDistance(y + shape.top, shape.masks, landX + shape.left, shape.bottoms)
+                    result.append(Placement(turns, shift * direction, rotationState, landX, y + drop))
+                shift += 1
+    return result
+
+# ones in every number below 1 << width, so counting the cells in a row is one lookup
+def popcounts(width):
+    counts = bytearray(1 << width)
+    for i in range(1, len(counts)):
+        counts[i] = counts[i >> 1] + (i & 1)
+    return counts
+
+class Bot(object):
+    def __init__(self, config, weights = None):
+        self.config = config
+        self.weights = weights or config.botWeights
+        self.lookahead = config.botLookahead
+        self.beam = config.botBeam
+        self.popcount = popcounts(config.width)
+        # scratch is where every placement is tried out, areas and nextAreas hold the play areas the lookahead carries on from,
+        # all made once and copied over rather than allocated for each placement
+        self.scratch = Area(config.height, config.width)
+        self.areas = [Area(config.height, config.width) for i in range(self.beam)]
+        self.nextAreas = [Area(config.height, config.width) for i in range(self.beam)]
+        # searched counts placements scored, for seeing how hard the bot works
+        self.searched = 0
+    # the heuristic: lines cleared is rewarded, total column height, holes and bumpiness are punished
+    # column heights come straight from the play area's skyline, holes are counted from the top of the stack down
+    def score(self, playArea, lines):
+        tops = playArea.tops
+        rows = playArea.rows
+        floor = playArea.height - 1
+        total = 0
+        bumpiness = 0
+        highest = floor
+        previous = 0
+        for x in range(playArea.width):
+            height = floor - tops[x]
+            total += height
+            if x:
+                bumpiness += abs(height - previous)
+            previous = height
+            if tops[x] < highest:
+                highest = tops[x]
+        seen = 0
+        holes = 0
+        for y in range(highest, floor):
+            row = rows[y]
+            holes += self.popcount[seen & ~row]
+            seen |= row
+        weights = self.weights
+        self.searched += 1
+        return weights['lines'] * lines + weights['height'] * total + weights['holes'] * holes + weights['bumpiness'] * bumpiness
+    # makes area the play area a placement leaves behind, returns the lines it cleared
+    def _land(self, area, playArea, pieceType, placement):
+        shape = SHAPES[pieceType][placement.rotationState]
+        area.copyFrom(playArea)
+        area.lock(placement.y + shape.top, shape.masks, placement.x + shape.left, shape.heads)
+        return area.clearLines()
+    # the best placement for the falling piece, looking ahead through the preview pieces (the known pieces after it) with a beam search:
+    # at each step only the beam best play areas so far are tried with the next piece, and a line of play is judged by where it ends up
+    def plan(self, playArea, t1, preview = ()):
+        config = self.config
+        scratch = self.scratch
+        # each branch is (score, first placement, the play area its last piece went into, where that piece went, its type, lines cleared so far),
+        # only the beam best branches get their play area built, into areas, when the next piece is tried on them
+        branches = []
+        for placement in placements(playArea, t1.pieceType, t1.rotationState, t1.x, t1.y):
+            lines = self._land(scratch, playArea, t1.pieceType, placement)
+            branches.append((self.score(scratch, lines), placement, playArea, placement, t1.pieceType, lines))
+        areas = self.areas
+        nextAreas = self.nextAreas
+        for pieceType in preview[:self.lookahead]:
+            branches.sort(key = lambda branch: -branch[0])
+            nextBranches = []
+            for i in range(min(self.beam, len(branches))):
+                score, first, base, placement, placed, lines = branches[i]
+                area = areas[i]
+                self._land(area, base, placed, placement)
+                for nextPlacement in placements(area, pieceType, 0, config.spawnX, config.spawnY):
+                    nextLines = lines + self._land(scratch, area, pieceType, nextPlacement)
+                    nextBranches.append((self.score(scratch, nextLines), first, area, nextPlacement, pieceType, nextLines))
+            if not nextBranches:
+                break
+            branches = nextBranches
+            # the areas just built are what the next round's branches start from, so the next round builds into the other list
+            areas, nextAreas = nextAreas, areas
+        best = None
+        for branch in branches:
+            if best is None or branch[0] > best[0]:
+                best = branch
+        if best is None:
+            return None
+        return best[1]
+
+# an input backend that lets the bot play: it plans when a piece appears and then taps the buttons for it,
+# letting go between taps so every one counts, and plans again if the piece didn't end up where it should have (a kick or a fall got in the way)
+class BotInput(object):
+    def __init__(self, game, bot):
+        self.game = game
+        self.bot = bot
+        # the game reuses its Tetrimino, so a new piece is told apart by how many pieces had been placed when it appeared
+        self.piece = -1
+        self.presses = []
+        self.expected = None
+    def _plan(self):
+        game = self.game
+        t1 = game.t1
+        placement = self.bot.plan(game.playArea, t1, game.preview(self.bot.lookahead))
+        self.presses = []
+        if placement is None:
+            # nowhere to go, it just drops where it is
+            self.expected = None
+            self.presses.append('MD')
+            return
+        for i in range(placement.turns):
+            self.presses.append('MR')
+        for i in range(abs(placement.shift)):
+            self.presses.append('L' if placement.shift < 0 else 'R')
+        self.presses.append('MD')
+        self.presses.reverse()
+        self.expected = placement
+    def poll(self):
+        t1 = self.game.t1
+        if self.game.piecesPlaced != self.piece:
+            self.piece = self.game.piecesPlaced
+            self._plan()
+        elif self.expected and self.presses and self.presses[-1] == 'MD' and (t1.rotationState != self.expected.rotationState or
+            t1.x != self.expected.x):
+            self._plan()
+        if self.presses and self.game.holdTick == 0:
+            return self.presses.pop()
+        return 0
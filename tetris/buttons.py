@@ -0,0 +1,121 @@
+from array import array
+from tetris.backends import BUTTON_COMBOS
+from tetris.scheduler import ticks_ms, ticks_add, ticks_diff
+
+# interrupt driven buttons: every edge on a button pin is timestamped and queued by its IRQ handler, and poll() works out
+# from the queue what has been held since the last poll, so a tap that starts and ends between two polls still counts once, and two of them
+# still count twice
+# the queue and everything the handlers touch is allocated up front, since handlers run in the middle of the game loop
+
+# the pins each button is wired to and its bit in BUTTON_COMBOS
+BUTTON_PINS = ((0, 4), (1, 2), (2, 1), (3, 8)) # k2 drop, k0 left, k1 right, k3 modify
+
+# a fixed size ring buffer of button edges: the time it happened and a code of the button's index * 2, plus 1 if it was a press
+class EdgeQueue(object):
+    def __init__(self, size):
+        self.size = size
+        self.times = array('i', [0] * size)
+        self.codes = bytearray(size)
+        self.head = 0
+        self.tail = 0
+        # overflows counts edges thrown away because the queue was full
+        self.overflows = 0
+    def push(self, time, code):
+        head = (self.head + 1) % self.size
+        if head == self.tail:
+            self.overflows += 1
+            return
+        self.times[self.head] = time
+        self.codes[self.head] = code
+        self.head = head
+    def empty(self):
+        return self.head == self.tail
+
+class IrqInput(object):
+    def __init__(self, config, pins = None):
+        if pins is None:
+            from machine import Pin
+            pins = [Pin(number, Pin.IN, Pin.PULL_UP) for number, bit in BUTTON_PINS]
+        self.pins = pins
+        self.bits = bytes([bit for number, bit in BUTTON_PINS])
+        self.debounceMs = config.debounceMs
+        self.queue = EdgeQueue(config.inputQueueSize)
+        # state is what each button is doing as far as the debouncing goes (1 held, 0 not), lastEdge is when that last changed
+        self.state = bytearray(len(pins))
+        self.lastEdge = array('i', [ticks_add(ticks_ms(), -self.debounceMs)] * len(pins))
+        # missed is set while the last edge seen inside the debounce window left the pin away from state, missedAt is when that was
+        self.missed = bytearray(len(pins))
+        self.missedAt = array('i', [0] * len(pins))
+        # held is the buttons the game thinks are down, tapped is the buttons pressed since the last poll even if they were let go already
+        self.held = 0
+        self.tapped = 0
+        # gap is set when a second tap of a button waits in the queue, the next poll leaves it there and reports the button let go, so
+        # the game sees two presses rather than one held through both
+        self.gap = 0
+        # latency is from a press happening to poll() handing it to the game, in milliseconds
+        self.presses = 0
+        self.latencyTotal = 0
+        self.latencyMax = 0
+        self.handlers = []
+        for i in range(len(pins)):
+            self.handlers.append(self._handler(i))
+            pins[i].irq(handler = self.handlers[i], trigger = pins[i].IRQ_FALLING | pins[i].IRQ_RISING)
+    def _handler(self, i):
+        def handler(pin):
+            self._edge(i, 1 - pin.value(), ticks_ms())
+        return handler
+    # an edge that comes within debounceMs of the last one on the same button is bounce and ignored, update() catches the level it settled on,
+    # but it is remembered: if the pin comes back to state with a later edge, it really went the other way in between (a quick release
+    # followed by the next press), so both edges are queued and the two taps are not merged into one
+    def _edge(self, i, pressed, now):
+        if ticks_diff(now, self.lastEdge[i]) < self.debounceMs:
+            self.missed[i] = pressed != self.state[i]
+            self.missedAt[i] = now
+            return
+        if pressed == self.state[i]:
+            if not self.missed[i]:
+                return
+            self.queue.push(self.missedAt[i], 2 * i + 1 - pressed)
+        self.missed[i] = 0
+        self.state[i] = pressed
+        self.lastEdge[i] = now
+        self.queue.push(now, 2 * i + pressed)
+    # queues an edge for any button whose pin has settled somewhere other than where the last accepted edge left it
+    def update(self, now):
+        for i in range(len(self.pins)):
+            pressed = 1 - self.pins[i].value()
+            if pressed != self.state[i] and ticks_diff(now, self.lastEdge[i]) >= self.debounceMs:
+                self._edge(i, pressed, now)
+    # the buttons held since the last poll, in the same form as checkButtons
+    def poll(self):
+        now = ticks_ms()
+        self.update(now)
+        if self.gap:
+            self.gap = 0
+            return BUTTON_COMBOS[self.held]
+        queue = self.queue
+        while queue.tail != queue.head:
+            code = queue.codes[queue.tail]
+            bit = self.bits[code >> 1]
+            if code & 1:
+                if self.tapped & bit and not self.held & bit:
+                    self.gap = 1
+                    break
+                self.held |= bit
+                self.tapped |= bit
+                latency = ticks_diff(now, queue.times[queue.tail])
+                self.presses += 1
+                self.latencyTotal += latency
+                if latency > self.latencyMax:
+                    self.latencyMax = latency
+            else:
+                self.held &= ~bit
+            queue.tail = (queue.tail + 1) % queue.size
+        mask = self.held | self.tapped
+        self.tapped = 0
+        return BUTTON_COMBOS[mask]
+    # average milliseconds from a press to the game seeing it
+    def averageLatency(self):
+        if not self.presses:
+            return 0
+        return self.latencyTotal / self.presses
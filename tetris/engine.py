@@ -0,0 +1,438 @@
+from tetris.board import Area
+from tetris.pieces import SHAPES, KICKS
+from tetris.bag import PieceBag
+from tetris.scheduler import ticks_us
+import random
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# PROFILE times the phases of step() into game.profiler (see profiler.py), and app.py's loop imports it from here, so the two can't
+# disagree, at 0 the Pico compiles the timing out of this module
+PROFILE = const(0)
+if PROFILE:
+    from tetris.profiler import Profiler, INPUT, FALL, CLEAR
+
+# the game without any hardware: it takes the buttons held down this frame and updates the play area and the falling piece,
+# drawing, button polling and timing are left to whoever calls step(), see app.py for the Pico and backends.py for the stand-ins
+
+##########################################################################################################################
+# CLASSES:
+# configurable things
+class Config(object):
+    def __init__(self):
+        # block size
+        self.size = 4
+        # width is the play area's width, so it's the display's y value
+        # height is the play area's height, so it's the display's x value
+        self.height = 22
+        self.width = 10
+        # fallDistance is the difference in coordinates between two adjacent grid spaces
+        self.fallDistance = 6
+        # displayWidth and displayHeight are relative to the proper orientation of the display
+        self.displayWidth = 128
+        self.displayHeight = 64
+        # wallWidth is the amount of space given to each of the game's walls
+        self.wallWidth = 2
+        # gameWidth and gameHeight are relative to the game's interpretation of the display's orientation (on its side)
+        self.gameWidth = self.displayHeight - (self.wallWidth * 2)
+        self.gameHeight = self.displayWidth
+        # all times are in milliseconds
+        # stepMs is how often the buttons are read and the game moves on by one step, the game runs on this clock whatever the drawing costs
+        self.stepMs = 16
+        # frameCap is the most frames drawn per second, when drawing can't keep up frames are skipped rather than the game slowing down
+        self.frameCap = 30
+        # maxCatchUp is the most steps run back to back to catch up after a stall, anything longer than that is let go
+        self.maxCatchUp = 5
+        # gravityCurve is how long a piece takes to fall one row at each level, every level past the end of the list uses the last entry
+        self.gravityCurve = [800, 720, 630, 550, 470, 380, 300, 220, 130, 100, 80, 80, 80, 70, 70, 70, 50, 50, 50, 30]
+        # linesPerLevel is how many cleared lines it takes to go up a level
+        self.linesPerLevel = 10
+        # lineScores is what clearing 0 to 4 lines at once scores, times one more than the level
+        self.lineScores = (0, 40, 100, 300, 1200)
+        # garbageLines is how many garbage rows clearing 0 to 4 lines at once sends the opponent in a versus match (see versus.py)
+        self.garbageLines = (0, 0, 1, 2, 4)
+        # gravity is the current level's fall time, fallDelay is the fall time in use right now (it's shorter while soft dropping)
+        self.gravity = self.gravityCurve[0]
+        self.fallDelay = self.gravity
+        self.softDropDelay = 40
+        # das is the amount of time between when you begin to hold a button and when it begins to repeat itsself,
+        # arr is the time between repeats after that (several repeats happen in one step if arr is shorter than stepMs), arr has to be shorter than das
+        self.das = 160
+        self.arr = 50
+        # botWeights score a placement for the bot (see bot.py): lines it clears, the total height of the columns, covered holes, and bumpiness
+        # (how much neighbouring columns differ in height), botLookahead is how many preview pieces it plans ahead with and botBeam how many
+        # of the best placements it keeps looking into at each step
+        self.botWeights = {'lines': 0.760666, 'height': -0.510066, 'holes': -0.35663, 'bumpiness': -0.184483}
+        self.botLookahead = 1
+        self.botBeam = 4
+        # demo has the bot play instead of the buttons, for an attract mode
+        self.demo = False
+        # versus plays against another Pico on a UART (see versus.py), cleared lines send garbage rows over, nothing is saved or recorded
+        # the UART's TX goes to the other Pico's RX and the other way round
+        self.versus = False
+        self.uartId = 0
+        self.uartBaud = 115200
+        self.uartTx = 16
+        self.uartRx = 17
+        # ghost draws an outline of the falling piece where it would land
+        self.ghost = True
+        # display is what the game is drawn on (see readyDisplay in backends.py): 'i2c' or 'spi' for an SSD1306 on that bus, or on a computer
+        # 'png' to write frames to displayPath, 'terminal' to print them, or 'memory', displayEvery is how many frames go by between those
+        self.display = 'i2c'
+        self.displayPath = 'frames'
+        self.displayEvery = 1
+        # the I2C bus and its clock in Hz, the SSD1306 is rated for 400 kHz but most modules keep up at 1000000
+        self.i2cId = 0
+        self.i2cScl = 13
+        self.i2cSda = 12
+        self.i2cFreq = 400000
+        # the SPI bus, its clock in Hz (the SSD1306 takes up to 10 MHz) and its pins, sck and mosi have to be ones spiId can use
+        self.spiId = 1
+        self.spiFreq = 8000000
+        self.spiSck = 10
+        self.spiMosi = 11
+        self.spiCs = 9
+        self.spiDc = 8
+        self.spiRes = 12
+        # dualCore has the display flushed from a thread on the Pico's second core (see flushthread.py) so the game never waits on I2C
+        self.dualCore = False
+        # profileEveryMs is how often the phase timings are printed over serial when PROFILE is on (see profiler.py), 0 for only when a key is sent
+        self.profileEveryMs = 10000
+        # gcStats has app.py count heap allocations and garbage collections every frame (see gcstats.py) and print them at the end
+        self.gcStats = False
+        # replayFile is where the Pico records the game being played (see replay.py), None turns recording off
+        self.replayFile = 'last.replay'
+        # saveFile keeps the high scores and a game left with 'MDLR' to pick up at the next boot (see save.py), None turns saving off,
+        # saveSlots is how many records it takes turns writing, highScoreCount how many scores are kept
+        self.saveFile = 'save.bin'
+        self.saveSlots = 4
+        self.highScoreCount = 5
+        # debounceMs is how long a button has to stay put before another edge on it counts, inputQueueSize is how many edges can wait to be read
+        self.debounceMs = 15
+        self.inputQueueSize = 32
+        # spawnX and spawnY are where the top left corner of a new piece's bounding box starts
+        self.spawnX = 3
+        self.spawnY = 0
+        # pieceTypes are the types of pieces possible
+        self.pieceTypes = ['J', 'L', 'S', 'Z', 'I', 'O', 'T']
+        # previewCount is how many pieces after the falling one are known ahead of time (see bag.py)
+        self.previewCount = 5
+        
+# the x and y values held by Block are the coordinates on the screen, not the location in the array
+# tetriminos will be made of these:
+class Block(object):
+    __slots__ = ('active', 'x', 'y')
+    def __init__(self, x = 4, y = 1):
+        self.active = True
+        self.x = x
+        self.y = y
+    def update(self, x, y):
+        self.x = x
+        self.y = y
+
+# x and y are the top left corner of the piece's bounding box in the play area, blocks are kept in step with them for drawing
+# landY is the y the piece would land at if it dropped straight down from where it is, which is where the ghost piece is drawn
+# a game has one Tetrimino for its whole life, every new piece reuses the same object and blocks, so spawning allocates nothing
+class Tetrimino(object):
+    __slots__ = ('blocks', 'active', 'pieceType', 'shapes', 'kicks', 'rotationState', 'x', 'y', 'landY')
+    def __init__(self, pieceType, config, playArea):
+        self.blocks = [Block(), Block(), Block(), Block()]
+        self.spawn(pieceType, config, playArea)
+    def spawn(self, pieceType, config, playArea):
+        self.active = True
+        self.pieceType = pieceType
+        self.shapes = SHAPES[pieceType]
+        self.kicks = KICKS[pieceType]
+        self.rotationState = 0
+        self.x = config.spawnX
+        self.y = config.spawnY
+        self._update(playArea)
+    # puts the piece straight where it was, for picking a saved game up again
+    def moveTo(self, rotationState, x, y, playArea):
+        self.rotationState = rotationState
+        self.x = x
+        self.y = y
+        self._update(playArea)
+    # copies the current rotation state's cells into the blocks
+    def _updateBlocks(self):
+        cells = self.shapes[self.rotationState].cells
+        for i in range(4):
+            self.blocks[i].update(self.x + cells[i][0], self.y + cells[i][1])
+    # after a move or a turn: the blocks, and landY from the play area's skyline
+    def _update(self, playArea):
+        self._updateBlocks()
+        shape = self.shapes[self.rotationState]
+        self.landY = self.y + playArea.dropDistance(self.y + shape.top, shape.masks, self.x + shape.left, shape.bottoms)
+    # True if the piece would fit in the play area in the given rotation state at the given position
+    def _fits(self, rotationState, x, y, playArea):
+        shape = self.shapes[rotationState]
+        if x + shape.left < 0 or x + shape.right >= playArea.width:
+            return False
+        return not playArea.collides(y + shape.top, shape.masks, x + shape.left)
+    def _place(self, playArea):
+        shape = self.shapes[self.rotationState]
+        playArea.lock(self.y + shape.top, shape.masks, self.x + shape.left, shape.heads)
+        self.active = False
+    # falling doesn't change where the piece lands, so landY says whether there's room without checking the play area
+    def fall(self, config, playArea):
+        if self.y < self.landY:
+            self.y += 1
+            self._updateBlocks()
+        else:
+            self._place(playArea)
+    def moveLeft(self, playArea):
+        if self._fits(self.rotationState, self.x - 1, self.y, playArea):
+            self.x -= 1
+            self._update(playArea)
+    def moveRight(self, config, playArea):
+        if self._fits(self.rotationState, self.x + 1, self.y, playArea):
+            self.x += 1
+            self._update(playArea)
+    # direction is 0 for clockwise and 1 for counter-clockwise, the kicks are tried in order and the rotation is dropped if none fit
+    def _rotate(self, direction, playArea):
+        if direction == 0:
+            rotationState = (self.rotationState + 1) % 4
+        else:
+            rotationState = (self.rotationState - 1) % 4
+        for kickX, kickY in self.kicks[direction][self.rotationState]:
+            if self._fits(rotationState, self.x + kickX, self.y - kickY, playArea):
+                self.x += kickX
+                self.y -= kickY
+                self.rotationState = rotationState
+                self._update(playArea)
+                return True
+        return False
+    def rotateRight(self, config, playArea):
+        self._rotate(0, playArea)
+    def rotateLeft(self, config, playArea):
+        self._rotate(1, playArea)
+    def hardDrop(self, config, playArea):
+        self.y = self.landY
+        self._updateBlocks()
+        self._place(playArea)
+        
+# xorshift random numbers: the same seed gives the same numbers on the Pico and on a computer (random doesn't),
+# which is what lets a replay recorded on one be played back on the other
+# the 32 bit state is kept as two 16 bit halves, since on the Pico an int over 30 bits lives on the heap and every shift would allocate one
+class Xorshift(object):
+    __slots__ = ('high', 'low')
+    def __init__(self, seed):
+        seed = (seed & 0xFFFFFFFF) or 0x9E3779B9
+        self.high = seed >> 16
+        self.low = seed & 0xFFFF
+    # one xorshift32 step (x ^= x << 13, x ^= x >> 17, x ^= x << 5) done on the halves
+    def _step(self):
+        high = self.high
+        low = self.low
+        high ^= ((high << 13) | (low >> 3)) & 0xFFFF
+        low ^= (low << 13) & 0xFFFF
+        low ^= high >> 1
+        high ^= ((high << 5) | (low >> 11)) & 0xFFFF
+        low ^= (low << 5) & 0xFFFF
+        self.high = high
+        self.low = low
+    def next(self):
+        self._step()
+        return (self.high << 16) | self.low
+    # the next number mod n, worked out from the halves so no big int is made
+    def randrange(self, n):
+        self._step()
+        return ((self.high % n) * (65536 % n) + self.low) % n
+    def choice(self, items):
+        return items[self.randrange(len(items))]
+
+# one game from the first piece to the last, step() is one pass of the game loop
+class Game(object):
+    def __init__(self, config, seed = None):
+        # the seed decides the piece order, the same seed always deals the same pieces
+        if seed is None:
+            seed = random.getrandbits(30)
+        self.seed = seed
+        self.rng = Xorshift(seed)
+        self.config = config
+        self.playArea = Area(config.height, config.width)
+        # fallTime is how long the piece has waited since it last fell, holdTick is how long the current buttons have been held
+        self.fallTime = 0
+        self.holdTick = 0
+        self.holdingButton = False
+        self.lost = False
+        self.frame = 0
+        self.linesCleared = 0
+        self.score = 0
+        self.level = 0
+        # garbage is what an opponent has sent and is waiting to go under the stack when the falling piece locks, as (rows, hole column)
+        # pairs, attack is how many rows the last piece to lock sends back once what was waiting has been cancelled out
+        self.garbage = []
+        self.attack = 0
+        self.piecesPlaced = 0
+        config.gravity = gravityForLevel(config, 0)
+        config.fallDelay = config.gravity
+        # spawned is True for the one frame in which a new piece appeared (and lines may have been cleared), so the screen needs a full redraw
+        self.spawned = True
+        self.bag = PieceBag(config, self.rng)
+        self.t1 = Tetrimino(self.bag.next(), config, self.playArea)
+        self.profiler = Profiler(everyMs = config.profileEveryMs) if PROFILE else None
+    # one step is config.stepMs of game time, buttonPressed is what checkButtons returns, returns False once the game has been lost
+    def step(self, buttonPressed):
+        config = self.config
+        playArea = self.playArea
+        self.spawned = False
+        self.fallTime += config.stepMs
+        if self.t1.active:
+            if PROFILE:
+                started = ticks_us()
+            evaluateButton(self, buttonPressed)
+            if PROFILE:
+                self.profiler.record(INPUT, started)
+            if self.fallTime >= config.fallDelay:
+                if PROFILE:
+                    started = ticks_us()
+                self.t1.fall(config, playArea)
+                self.fallTime = 0
+                if PROFILE:
+                    self.profiler.record(FALL, started)
+        else:
+            if PROFILE:
+                started = ticks_us()
+            # lines are cleared before the next piece appears, so the new piece lands (and tops out or not) on the stack as it is now
+            self.piecesPlaced += 1
+            cleared = checkClear(playArea)
+            self.linesCleared += cleared
+            self.score += config.lineScores[cleared] * (self.level + 1)
+            self.attack = 0
+            if cleared:
+                self.attack = self._cancelGarbage(config.garbageLines[cleared])
+            elif self.garbage:
+                self._takeGarbage()
+            self.t1.spawn(self.bag.next(), config, playArea)
+            if checkIfLost(config, playArea, self.t1):
+                self.lost = True
+            self.spawned = True
+            self._levelCheck()
+            if PROFILE:
+                self.profiler.record(CLEAR, started)
+        self.frame += 1
+        return not self.lost
+    # rows rows of garbage with a hole in column hole, from an opponent, they go in when the falling piece locks without clearing anything
+    def receiveGarbage(self, rows, hole):
+        self.garbage.append((rows, hole))
+    # takes rows off the garbage waiting, oldest first, and returns what's left of them to send on
+    def _cancelGarbage(self, rows):
+        while rows and self.garbage:
+            waiting, hole = self.garbage[0]
+            if waiting > rows:
+                self.garbage[0] = (waiting - rows, hole)
+                return 0
+            rows -= waiting
+            del self.garbage[0]
+        return rows
+    # pushes all the garbage waiting in under the stack, the game is lost if that pushes any of the stack off the top
+    def _takeGarbage(self):
+        for rows, hole in self.garbage:
+            if self.playArea.addGarbage(rows, hole):
+                self.lost = True
+        del self.garbage[:]
+    # moves up a level every config.linesPerLevel lines, which speeds up gravity
+    def _levelCheck(self):
+        config = self.config
+        level = self.linesCleared // config.linesPerLevel
+        if level != self.level:
+            self.level = level
+            softDropping = config.fallDelay != config.gravity
+            config.gravity = gravityForLevel(config, level)
+            if not softDropping:
+                normalDrop(config)
+    # the types of the next n pieces after the falling one, n can be up to config.previewCount
+    def preview(self, n):
+        return self.bag.preview(n)
+    # everything needed to tell two games apart: the stack, the falling piece and the counters
+    def state(self):
+        t1 = self.t1
+        return {
+            'rows': bytes(self.playArea.rows),
+            'piece': t1.pieceType,
+            'preview': ''.join(self.preview(self.config.previewCount)),
+            'x': t1.x,
+            'y': t1.y,
+            'rotation': t1.rotationState,
+            'frame': self.frame,
+            'linesCleared': self.linesCleared,
+            'score': self.score,
+            'level': self.level,
+            'piecesPlaced': self.piecesPlaced,
+            'lost': self.lost,
+        }
+
+##########################################################################################################################
+# FUNCTIONS:
+# determines if the button is pressed and performs the relevant actions if so
+# (these update game.holdTick and game.holdingButton in place rather than handing back a tuple, which would be an allocation every step)
+def evaluateButton(game, buttonPressed):
+    if buttonPressed and buttonPressed != 'M':
+        holdCheck(game, buttonPressed)
+    else:
+        normalDrop(game.config)
+        game.holdTick = 0
+        game.holdingButton = False
+
+# checks if buttons are held and sends inputs, holdTick is how long they've been held minus the time already spent on repeats
+def holdCheck(game, buttonPressed):
+    config = game.config
+    if not game.holdTick:
+        game.holdTick = config.stepMs
+        moveBlock(config, game.playArea, game.t1, buttonPressed)
+    elif game.holdTick < config.das:
+        game.holdTick += config.stepMs
+    else:
+        game.holdingButton = True
+        if buttonPressed != 'ML' and buttonPressed != 'MR':
+            repeats = 0
+            while game.holdTick >= config.das and repeats < config.width:
+                moveBlock(config, game.playArea, game.t1, buttonPressed)
+                game.holdTick -= config.arr
+                repeats += 1
+        game.holdTick += config.stepMs
+
+# moves the block either left or right, or rotates it
+def moveBlock(config, playArea, t1, buttonPressed):
+    if buttonPressed == 'L':
+        t1.moveLeft(playArea)
+    elif buttonPressed == 'R':
+        t1.moveRight(config, playArea)
+    elif buttonPressed == 'ML':
+        t1.rotateLeft(config, playArea)
+    elif buttonPressed == 'MR':
+        t1.rotateRight(config, playArea)
+    elif buttonPressed == 'D':
+        softDrop(config)
+    elif buttonPressed == 'MD':
+        hardDrop(config, playArea, t1)
+
+# speeds up the rate at which tetriminos fall
+def softDrop(config):
+    config.fallDelay = config.softDropDelay
+
+# instantly drops a tetrimino
+def hardDrop(config, playArea, t1):
+    t1.hardDrop(config, playArea)
+
+# returns tetrimino fall rate to normal
+def normalDrop(config):
+    config.fallDelay = config.gravity
+
+# how long a piece takes to fall one row at a level
+def gravityForLevel(config, level):
+    return config.gravityCurve[min(level, len(config.gravityCurve) - 1)]
+
+# determine if the game has been lost (called at the creation of every new tetrimino)
+# the game is lost when the stack has reached row 1 in any column the new piece is in, which the skyline tells in one lookup per column
+def checkIfLost(config, playArea, t1):
+    shape = t1.shapes[t1.rotationState]
+    return playArea.reaches(1, t1.x + shape.left, shape.right - shape.left + 1)
+
+# check for clearable lines
+def checkClear(playArea):
+    return playArea.clearLines()
@@ -0,0 +1,72 @@
+import _thread
+from tetris.scheduler import sleep_us, ticks_us
+from tetris.render import PageViews
+
+# dual core flushing: the game loop draws into the framebuffer as usual and hands every finished frame to a thread that does the I2C transfer,
+# on the Pico _thread runs it on the second core, so polling the buttons and stepping the game never wait on the display
+# on a computer it's an ordinary thread, which is how the handoff gets tested against the stand-in display
+# the handoff takes no lock: a frame is copied into a second framebuffer, front, along with which page columns changed, and busy is set
+# last, the thread only reads front while busy is set and clears busy when it's done, and the game loop only writes front while busy is clear
+class FlushThread(object):
+    def __init__(self, renderer, idleUs = 200):
+        self.renderer = renderer
+        self.idleUs = idleUs
+        self.front = bytearray(len(renderer.buffer))
+        self.frontViews = PageViews(self.front, renderer.config.displayWidth, renderer.pages)
+        self.dirtyStart = bytearray(renderer.pages)
+        self.dirtyEnd = bytearray(renderer.pages)
+        self.busy = False
+        self.running = True
+        self.alive = True
+        # handedOff counts frames given to the thread, flushed the ones it has sent, dropped the frames that were ready while it was still
+        # sending (what changed in them goes out with the next frame handed off), bytesSent is what the thread sent
+        self.handedOff = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.bytesSent = 0
+        _thread.start_new_thread(self._loop, ())
+    # called by the game loop in place of renderer.flush(), returns False if the frame has to go out with a later one
+    def flush(self):
+        self.renderer.frames += 1
+        if self.busy:
+            self.dropped += 1
+            return False
+        self._handOff()
+        return True
+    def _handOff(self):
+        renderer = self.renderer
+        if not renderer._anyDirty():
+            return
+        self.front[:] = renderer.buffer
+        self.dirtyStart[:] = renderer.dirtyStart
+        self.dirtyEnd[:] = renderer.dirtyEnd
+        renderer.clearDirty()
+        self.handedOff += 1
+        self.busy = True
+    # the thread: sends whatever has been handed off, and sleeps for idleUs at a time when there's nothing to send
+    def _loop(self):
+        renderer = self.renderer
+        while self.running:
+            if self.busy:
+                started = ticks_us()
+                sent = renderer.send(self.frontViews, self.dirtyStart, self.dirtyEnd)
+                self.bytesSent += sent
+                renderer.bytesSent += sent
+                renderer.lastBytes = sent
+                renderer.flushed(started)
+                self.flushed += 1
+                self.busy = False
+            else:
+                sleep_us(self.idleUs)
+        self.alive = False
+    def _waitIdle(self):
+        while self.busy:
+            sleep_us(self.idleUs)
+    # sends everything drawn so far and stops the thread, the display is up to date once this returns
+    def stop(self):
+        self._waitIdle()
+        self._handOff()
+        self._waitIdle()
+        self.running = False
+        while self.alive:
+            sleep_us(self.idleUs)
@@ -0,0 +1,48 @@
+import gc
+import sys
+
+# counts heap allocations and garbage collections frame by frame, to check the game loop allocates nothing once it's running
+# on the Pico it reads gc.mem_alloc(), which only goes up until a collection, so every byte allocated shows up and a drop means a collection ran
+# on a computer there's no gc.mem_alloc(), so it counts the memory blocks Python has allocated (which only shows what's kept, not what's
+# made and thrown away straight after) and hears about collections from gc.callbacks
+class GcMonitor(object):
+    def __init__(self):
+        self.native = hasattr(gc, 'mem_alloc')
+        self.unit = 'bytes' if self.native else 'blocks'
+        self.frames = 0
+        # allocated is the total across every frame, worst the most in one frame, allocatingFrames how many frames allocated anything
+        self.allocated = 0
+        self.worst = 0
+        self.allocatingFrames = 0
+        self.collections = 0
+        if not self.native:
+            gc.callbacks.append(self._callback)
+        self.last = self._used()
+    def _used(self):
+        if self.native:
+            return gc.mem_alloc()
+        return sys.getallocatedblocks()
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self.collections += 1
+    # call once per pass of the main loop
+    def sample(self):
+        used = self._used()
+        delta = used - self.last
+        self.last = used
+        self.frames += 1
+        if delta < 0 and self.native:
+            # a collection ran during this frame, what the frame allocated is lost in what got freed
+            self.collections += 1
+            return
+        if delta > 0:
+            self.allocated += delta
+            self.allocatingFrames += 1
+            if delta > self.worst:
+                self.worst = delta
+    def stop(self):
+        if not self.native and self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+    def report(self):
+        return "allocations: %d %s over %d frames (%d frames allocated, worst %d), %d garbage collections" % (
+            self.allocated, self.unit, self.frames, self.allocatingFrames, self.worst, self.collections)
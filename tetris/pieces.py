@@ -0,0 +1,71 @@
+# piece shapes and rotations, worked out once at import so rotating a piece is a table lookup
+# cells are (x, y) offsets from the top left corner of the piece's bounding box, y grows downwards like the play area's rows
+# every shape is listed in its spawn state, the other three rotation states are the spawn state turned clockwise inside the box
+SPAWN_CELLS = {
+    'I': (4, ((0, 1), (1, 1), (2, 1), (3, 1))),
+    'J': (3, ((0, 0), (0, 1), (1, 1), (2, 1))),
+    'L': (3, ((2, 0), (0, 1), (1, 1), (2, 1))),
+    'O': (3, ((1, 0), (2, 0), (1, 1), (2, 1))),
+    'S': (3, ((1, 0), (2, 0), (0, 1), (1, 1))),
+    'T': (3, ((1, 0), (0, 1), (1, 1), (2, 1))),
+    'Z': (3, ((0, 0), (1, 0), (1, 1), (2, 1))),
+}
+
+# SRS wall kicks for turning clockwise out of rotation states 0, 1 (R), 2 and 3 (L), tried in order until one fits
+# these are written with y pointing up like the guideline's tables, so moving the piece by a kick means subtracting its y
+KICKS_CW = (
+    ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+    ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+)
+I_KICKS_CW = (
+    ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+    ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+)
+O_KICKS = ((0, 0),)
+
+# one rotation state of one piece: its cells, the columns and rows it spans inside the box,
+# and a bitmask for each row it covers with its leftmost column at bit 0 (shift by x + left to place it on the board)
+class Shape(object):
+    def __init__(self, cells):
+        self.cells = cells
+        self.left = min([x for x, y in cells])
+        self.right = max([x for x, y in cells])
+        self.top = min([y for x, y in cells])
+        bottom = max([y for x, y in cells])
+        masks = [0] * (bottom - self.top + 1)
+        for x, y in cells:
+            masks[y - self.top] |= 1 << (x - self.left)
+        self.masks = tuple(masks)
+        # bottoms is how far down from top the lowest cell of every column from left to right is, for dropping the shape onto the skyline
+        self.bottoms = tuple([max([y for cx, y in cells if cx == x]) - self.top for x in range(self.left, self.right + 1)])
+        # heads is how far down from top the highest cell of every column is, for updating the skyline when the shape locks
+        self.heads = tuple([min([y for cx, y in cells if cx == x]) - self.top for x in range(self.left, self.right + 1)])
+
+def _rotations(size, cells):
+    shapes = []
+    for i in range(4):
+        shapes.append(Shape(cells))
+        cells = tuple([(size - 1 - y, x) for x, y in cells])
+    return tuple(shapes)
+
+# a turn counter-clockwise out of state r undoes the clockwise turn out of state r - 1, so it uses that row of kicks reversed
+def _counterClockwise(kicksCW):
+    return tuple([tuple([(-x, -y) for x, y in kicksCW[(r - 1) % 4]]) for r in range(4)])
+
+SHAPES = {}
+KICKS = {}
+for _pieceType in SPAWN_CELLS:
+    if _pieceType == 'O':
+        # turning the O inside its box would shift it, it looks the same in every state anyway
+        SHAPES[_pieceType] = (Shape(SPAWN_CELLS[_pieceType][1]),) * 4
+        KICKS[_pieceType] = ((O_KICKS,) * 4, (O_KICKS,) * 4)
+        continue
+    SHAPES[_pieceType] = _rotations(SPAWN_CELLS[_pieceType][0], SPAWN_CELLS[_pieceType][1])
+    if _pieceType == 'I':
+        KICKS[_pieceType] = (I_KICKS_CW, _counterClockwise(I_KICKS_CW))
+    else:
+        KICKS[_pieceType] = (KICKS_CW, _counterClockwise(KICKS_CW))
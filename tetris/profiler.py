@@ -0,0 +1,110 @@
+import sys
+from array import array
+from tetris.scheduler import ticks_us, ticks_ms, ticks_diff
+
+# phase timings for the field: every phase of the game loop is timed in microseconds into a fixed size ring buffer, with a running
+# min, max, total and a histogram, and a short summary goes out over the USB serial port every few seconds or when a key is sent to it
+# it's only there when PROFILE is on in engine.py (app.py uses the same flag): with micropython's const() a false PROFILE has the game's
+# timing calls compiled out
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# the phases, in the order the loop runs them (input is evaluateButton, fall is the piece falling, clear is checkClear and the next piece)
+BUTTONS = const(0)
+INPUT = const(1)
+FALL = const(2)
+CLEAR = const(3)
+DRAW = const(4)
+SHOW = const(5)
+PHASES = ('buttons', 'input', 'fall', 'clear', 'draw', 'show')
+# histogram bucket i counts timings under 2 ** i microseconds (and at least half that), the last bucket takes everything longer
+BUCKETS = const(17)
+
+class Profiler(object):
+    def __init__(self, size = 128, everyMs = 10000):
+        phases = len(PHASES)
+        self.size = size
+        # samples is one ring buffer of the last size timings per phase, back to back, next is where each one writes next
+        self.samples = array('H', [0] * (size * phases))
+        self.next = array('H', [0] * phases)
+        self.counts = array('I', [0] * phases)
+        # totals is a list rather than an array so it can go past 32 bits after a long enough run
+        self.totals = [0] * phases
+        self.mins = array('H', [0xFFFF] * phases)
+        self.maxes = array('H', [0] * phases)
+        self.histograms = array('I', [0] * (BUCKETS * phases))
+        # everyMs is how often a summary is printed without being asked for, 0 for only when asked
+        self.everyMs = everyMs
+        self.lastDump = ticks_ms()
+        # a key sent over serial asks for a summary, checked without blocking (ipoll on the Pico, since poll() makes a new list every call)
+        self.poll = None
+        try:
+            import select
+            poller = select.poll()
+            poller.register(sys.stdin, select.POLLIN)
+            self.poll = getattr(poller, 'ipoll', poller.poll)
+        except (ImportError, AttributeError, OSError, ValueError):
+            self.poll = None
+    def start(self):
+        return ticks_us()
+    # records the time since started (a start() value) against phase
+    def record(self, phase, started):
+        us = ticks_diff(ticks_us(), started)
+        if us > 0xFFFF:
+            us = 0xFFFF
+        elif us < 0:
+            us = 0
+        i = self.next[phase]
+        self.samples[phase * self.size + i] = us
+        self.next[phase] = (i + 1) % self.size
+        self.counts[phase] += 1
+        self.totals[phase] += us
+        if us < self.mins[phase]:
+            self.mins[phase] = us
+        if us > self.maxes[phase]:
+            self.maxes[phase] = us
+        bucket = 0
+        while us and bucket < BUCKETS - 1:
+            us >>= 1
+            bucket += 1
+        self.histograms[phase * BUCKETS + bucket] += 1
+    # the 99th percentile of what's in the ring buffer, so of the last size timings
+    def _p99(self, phase):
+        kept = min(self.counts[phase], self.size)
+        if not kept:
+            return 0
+        start = phase * self.size
+        ordered = sorted(self.samples[start:start + kept])
+        return ordered[min(kept - 1, kept * 99 // 100)]
+    # one line per phase: count, min, average, p99 of the recent ones and max in microseconds, then the histogram up to its last used bucket
+    def summary(self):
+        lines = []
+        for phase in range(len(PHASES)):
+            count = self.counts[phase]
+            if not count:
+                continue
+            histogram = self.histograms[phase * BUCKETS:(phase + 1) * BUCKETS]
+            last = BUCKETS - 1
+            while last and not histogram[last]:
+                last -= 1
+            lines.append("%-7s n %d min %d avg %d p99 %d max %d us hist %s" % (PHASES[phase], count, self.mins[phase],
+                self.totals[phase] // count, self._p99(phase), self.maxes[phase], '/'.join([str(n) for n in histogram[:last + 1]])))
+        return '\n'.join(lines)
+    # True if a key came in over serial (it's read and thrown away, the newline after it doesn't count) or the last summary was everyMs ago
+    def due(self, now):
+        if self.poll:
+            for event in self.poll(0):
+                key = sys.stdin.read(1)
+                if not key:
+                    # stdin is closed (on a computer with nothing attached), so there's nothing to listen to
+                    self.poll = None
+                elif key not in '\r\n':
+                    return True
+                break
+        return bool(self.everyMs) and ticks_diff(now, self.lastDump) >= self.everyMs
+    def dump(self, now):
+        self.lastDump = now
+        print(self.summary())
@@ -0,0 +1,83 @@
+import struct
+from array import array
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# the messages the two games of a versus match send each other (see versus.py), every one SIZE bytes:
+#   SYNC | the message type, three bytes that depend on the type, and a 4 byte stamp
+#   HELLO: the protocol VERSION, the stamp is the sender's seed
+#   GARBAGE: how many rows, the column of their hole
+#   LOCK: how many pieces the sender has placed (the low byte), how many lines that piece cleared, the height of the stack
+#   OVER: LOST if the sender lost, STOPPED if it stopped for any other reason (it won, it was quit, it ran out of frames)
+#   ECHO: the type of the message it answers, the stamp sent back as it came
+# GARBAGE and LOCK are stamped with the ticks_us() of the step whose input caused them, which is what input to opponent latency is timed from
+# the top nibble of the first byte is always SYNC, so a reader that lost its place in a byte stream can find the next message
+SYNC = const(0xA0)
+HELLO = const(1)
+GARBAGE = const(2)
+LOCK = const(3)
+OVER = const(4)
+ECHO = const(5)
+VERSION = const(1)
+LOST = const(0)
+STOPPED = const(1)
+SIZE = const(8)
+FORMAT = '<BBBBI'
+NAMES = ('', 'hello', 'garbage', 'lock', 'over', 'echo')
+
+# packs a message into buffer (SIZE bytes, made once by whoever sends)
+def encode(buffer, kind, a = 0, b = 0, c = 0, stamp = 0):
+    struct.pack_into(FORMAT, buffer, 0, SYNC | kind, a, b, c, stamp & 0xFFFFFFFF)
+
+# the type, the three bytes and the stamp of a message, or a type of 0 if it doesn't start with SYNC
+def decode(data):
+    head, a, b, c, stamp = struct.unpack_from(FORMAT, data)
+    if head & 0xF0 != SYNC:
+        return 0, a, b, c, stamp
+    return head & 0x0F, a, b, c, stamp
+
+# latencies in microseconds: count, total and max, and a histogram where bucket i counts the ones under 2 ** i us (the last takes the rest)
+LATENCY_BUCKETS = const(24)
+
+class Latency(object):
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.histogram = array('I', [0] * LATENCY_BUCKETS)
+    def add(self, us):
+        if us < 0:
+            us = 0
+        self.count += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+        bucket = 0
+        while us and bucket < LATENCY_BUCKETS - 1:
+            us >>= 1
+            bucket += 1
+        self.histogram[bucket] += 1
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        for i in range(LATENCY_BUCKETS):
+            self.histogram[i] += other.histogram[i]
+    def average(self):
+        if not self.count:
+            return 0
+        return self.total // self.count
+    # the upper bound of the bucket the fraction of latencies falls in, so a power of two at most twice the real one
+    def percentile(self, fraction):
+        target = self.count * fraction
+        seen = 0
+        for i in range(LATENCY_BUCKETS):
+            seen += self.histogram[i]
+            if seen and seen >= target:
+                return 1 << i
+        return 0
+    def report(self):
+        return "%d us average, p99 under %d us, %d us worst over %d" % (self.average(), self.percentile(0.99), self.max, self.count)
@@ -0,0 +1,297 @@
+from array import array
+from tetris.scheduler import ticks_us, ticks_diff
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# SSD1306 commands used to open an address window, the rest of the driver's commands are left to the driver
+SET_COL_ADDR = const(0x21)
+SET_PAGE_ADDR = const(0x22)
+# a partial flush sends whole CHUNK column runs of a page, see PageViews
+CHUNK = const(16)
+
+# draw border walls and floor
+def drawBorders(oled):
+    oled.fill_rect(0, 0, 128, 1, 1)
+    oled.fill_rect(0, 63, 128, 1, 1)
+    oled.fill_rect(123, 0, 5, 64, 1)
+
+# where every play area cell is on the screen, worked out once: cellX is the screen x of each row, cellY the screen y of each column
+def cellOrigins(config):
+    cellX = array('h', [y * config.fallDistance - 3 for y in range(config.height)])
+    cellY = array('h', [config.gameWidth - 3 - x * config.fallDistance for x in range(config.width)])
+    return cellX, cellY
+
+# a play area row is drawn as size screen columns that all look the same, 8 bytes (one per page) ready to be copied straight into the
+# framebuffer, for a row mask they're its low half's sprite ORed with its high half's, page by page
+# sprites for all the masks of count columns from first on, pages bytes each
+def _halfSprites(cellY, size, first, count, pages):
+    sprites = bytearray(pages << count)
+    # the masks with column x filled are the masks below its bit with column x added
+    for x in range(count):
+        column = bytearray(pages)
+        for py in range(cellY[first + x], cellY[first + x] + size):
+            column[py >> 3] |= 1 << (py & 7)
+        bit = 1 << x
+        for mask in range(bit):
+            for page in range(pages):
+                sprites[(mask | bit) * pages + page] = sprites[mask * pages + page] | column[page]
+    return sprites
+
+# the low and high half sprites, the low ones with the border pixels at the top and bottom already in
+# two halves of 5 columns are 512 bytes built in about 530 loop steps, where one table for every 10 column mask was 8 KB and about 9200
+def rowSprites(config, cellY):
+    pages = config.displayHeight // 8
+    lowBits = config.width >> 1
+    low = _halfSprites(cellY, config.size, 0, lowBits, pages)
+    high = _halfSprites(cellY, config.size, lowBits, config.width - lowBits, pages)
+    for mask in range(1 << lowBits):
+        low[mask * pages] |= 1
+        low[mask * pages + pages - 1] |= 0x80
+    return low, high
+
+# memoryviews of every CHUNK columns of every page of a framebuffer, and of all of it, made once: slicing a memoryview makes a new one
+# on the heap, so a flush that sliced out the exact columns that changed would allocate every frame, instead it widens them to whole
+# chunks and sends those one at a time, the display's address window carries on from one to the next
+class PageViews(object):
+    def __init__(self, buffer, width, pages):
+        view = memoryview(buffer)
+        self.whole = view
+        self.perPage = width // CHUNK
+        self.chunks = [view[i:i + CHUNK] for i in range(0, width * pages, CHUNK)]
+
+# the renderer owns the framebuffer: it only redraws everything after a spawn or a line clear, otherwise it just moves the falling piece,
+# and it remembers which columns of which 8 pixel pages were touched so flush() can send only those over I2C
+class Renderer(object):
+    def __init__(self, oled, config):
+        self.oled = oled
+        self.config = config
+        self.pages = config.displayHeight // 8
+        self.cellX, self.cellY = cellOrigins(config)
+        # with the framebuffer at hand the stack is copied in a row at a time from rowSprites, without it it's drawn a cell at a time
+        self.blit = hasattr(oled, 'buffer')
+        if self.blit:
+            self.lowSprites, self.highSprites = rowSprites(config, self.cellY)
+            self.lowBits = config.width >> 1
+        # dirtyStart and dirtyEnd are the first and last changed column of every page, a page is clean while start > end
+        self.dirtyStart = bytearray([255] * self.pages)
+        self.dirtyEnd = bytearray(self.pages)
+        # cells is where the piece and then its ghost were drawn last frame as x, y pairs, so they can be erased without redrawing the board
+        self.cells = [-1] * 16
+        self.ghost = config.ghost
+        self.fullRedraw = True
+        # partial needs the driver's write_cmd/write_data, without them every flush falls back to show()
+        self.partial = hasattr(oled, 'write_cmd') and hasattr(oled, 'write_data')
+        self.buffer = memoryview(oled.buffer) if self.partial else None
+        self.views = PageViews(oled.buffer, config.displayWidth, self.pages) if self.partial else None
+        # bytes counts what went over the bus, one per command or data byte plus the control byte that starts each transfer
+        self.frames = 0
+        self.bytesSent = 0
+        self.lastBytes = 0
+        # how long sending a frame takes on whatever display this is, over the frames that had anything to send, in microseconds
+        self.flushes = 0
+        self.flushUs = 0
+        self.flushMaxUs = 0
+        self.lastFlushUs = 0
+        # the computer stand-ins (see backends.py) want to know when a whole frame has been sent, the real driver has no present()
+        self.present = getattr(oled, 'present', None)
+    # forces the next draw() to redraw the whole screen and the next flush() to send all of it
+    def invalidate(self):
+        self.fullRedraw = True
+    def markRect(self, x, y, w, h):
+        if x < 0:
+            w += x
+            x = 0
+        if y < 0:
+            h += y
+            y = 0
+        x1 = min(x + w, self.config.displayWidth) - 1
+        y1 = min(y + h, self.config.displayHeight) - 1
+        if x1 < x or y1 < y:
+            return
+        for page in range(y >> 3, (y1 >> 3) + 1):
+            if x < self.dirtyStart[page]:
+                self.dirtyStart[page] = x
+            if x1 > self.dirtyEnd[page]:
+                self.dirtyEnd[page] = x1
+    def markAll(self):
+        for page in range(self.pages):
+            self.dirtyStart[page] = 0
+            self.dirtyEnd[page] = self.config.displayWidth - 1
+    # the pixel rectangle of a play area cell (x is the column, y is the row)
+    def _cell(self, x, y, color):
+        size = self.config.size
+        px = self.cellX[y]
+        py = self.cellY[x]
+        self.oled.fill_rect(px, py, size, size, color)
+        self.markRect(px, py, size, size)
+    # a cell of the ghost piece, just the outline
+    def _ghostCell(self, x, y):
+        size = self.config.size
+        px = self.cellX[y]
+        py = self.cellY[x]
+        self.oled.rect(px, py, size, size, 1)
+        self.markRect(px, py, size, size)
+    def draw(self, playArea, t1):
+        if self.fullRedraw:
+            self.drawBoard(playArea)
+        self.drawPiece(t1)
+    # the walls and the stack, which wipes out the piece too, so it's marked as not drawn anywhere
+    def drawBoard(self, playArea):
+        oled = self.oled
+        oled.fill(0)
+        drawBorders(oled)
+        if self.blit:
+            self._blitStack(playArea)
+        else:
+            playArea.draw(oled, self.config)
+        self.markAll()
+        for i in range(16):
+            self.cells[i] = -1
+        self.fullRedraw = False
+    # copies every row of the stack that has anything in it from rowSprites, the floor row is left to drawBorders
+    # the framebuffer has just been cleared, so a page with nothing in it is skipped
+    def _blitStack(self, playArea):
+        buffer = self.oled.buffer
+        width = self.config.displayWidth
+        size = self.config.size
+        pages = self.pages
+        lowSprites = self.lowSprites
+        highSprites = self.highSprites
+        lowBits = self.lowBits
+        lowMask = (1 << lowBits) - 1
+        rows = playArea.rows
+        cellX = self.cellX
+        for y in range(playArea.height - 1):
+            mask = rows[y]
+            if not mask:
+                continue
+            px = cellX[y]
+            x0 = px if px > 0 else 0
+            n = px + size - x0
+            if n <= 0:
+                continue
+            low = (mask & lowMask) * pages
+            high = (mask >> lowBits) * pages
+            for page in range(pages):
+                value = lowSprites[low + page] | highSprites[high + page]
+                if value:
+                    start = page * width + x0
+                    for i in range(start, start + n):
+                        buffer[i] = value
+    # erases the piece and its ghost where they were last frame and draws them where they are now, if the piece moved at all
+    # the ghost is where the piece would land (t1.landY), it's only drawn while the piece is above it and goes under the piece where they meet
+    def drawPiece(self, t1):
+        cells = self.cells
+        moved = False
+        for i in range(4):
+            block = t1.blocks[i]
+            if cells[2 * i] != block.x or cells[2 * i + 1] != block.y:
+                moved = True
+        if not moved:
+            return
+        for i in range(8):
+            if cells[2 * i + 1] >= 0:
+                self._cell(cells[2 * i], cells[2 * i + 1], 0)
+                cells[2 * i + 1] = -1
+        drop = t1.landY - t1.y
+        if self.ghost and drop > 0:
+            for i in range(4):
+                block = t1.blocks[i]
+                cells[8 + 2 * i] = block.x
+                cells[9 + 2 * i] = block.y + drop
+                self._ghostCell(block.x, block.y + drop)
+        for i in range(4):
+            block = t1.blocks[i]
+            cells[2 * i] = block.x
+            cells[2 * i + 1] = block.y
+            self._cell(block.x, block.y, 1)
+    # sends the dirty part of every page, neighbouring dirty pages share one address window
+    def flush(self):
+        started = ticks_us()
+        sent = 0
+        if not self.partial:
+            if self._anyDirty():
+                self.oled.show()
+                sent = len(self.oled.buffer) + 13
+        else:
+            sent = self.send(self.views, self.dirtyStart, self.dirtyEnd)
+        if sent:
+            self.flushed(started)
+        self.clearDirty()
+        self.frames += 1
+        self.bytesSent += sent
+        self.lastBytes = sent
+        return sent
+    # sends the columns that dirtyStart and dirtyEnd mark from the buffer views (PageViews) are of, returns how many bytes that took,
+    # flush() sends the framebuffer this way and a FlushThread (see flushthread.py) its own copy of it
+    def send(self, views, dirtyStart, dirtyEnd):
+        sent = 0
+        page = 0
+        while page < self.pages:
+            if dirtyStart[page] > dirtyEnd[page]:
+                page += 1
+                continue
+            first = page
+            x0 = dirtyStart[page]
+            x1 = dirtyEnd[page]
+            while page + 1 < self.pages and dirtyStart[page + 1] <= dirtyEnd[page + 1]:
+                page += 1
+                x0 = min(x0, dirtyStart[page])
+                x1 = max(x1, dirtyEnd[page])
+            sent += self._window(views, first, page, x0, x1)
+            page += 1
+        return sent
+    # records how long a frame took to send since started (a ticks_us() value) and presents it on a stand-in display
+    def flushed(self, started):
+        us = ticks_diff(ticks_us(), started)
+        self.flushes += 1
+        self.flushUs += us
+        self.lastFlushUs = us
+        if us > self.flushMaxUs:
+            self.flushMaxUs = us
+        if self.present:
+            self.present()
+    def clearDirty(self):
+        for page in range(self.pages):
+            self.dirtyStart[page] = 255
+            self.dirtyEnd[page] = 0
+    def _anyDirty(self):
+        for page in range(self.pages):
+            if self.dirtyStart[page] <= self.dirtyEnd[page]:
+                return True
+        return False
+    # the window is widened to whole chunks, so everything sent is a view made up front
+    def _window(self, views, page0, page1, x0, x1):
+        oled = self.oled
+        x0 -= x0 % CHUNK
+        x1 += CHUNK - 1 - x1 % CHUNK
+        oled.write_cmd(SET_COL_ADDR)
+        oled.write_cmd(x0)
+        oled.write_cmd(x1)
+        oled.write_cmd(SET_PAGE_ADDR)
+        oled.write_cmd(page0)
+        oled.write_cmd(page1)
+        if page0 == 0 and page1 == self.pages - 1 and x0 == 0 and x1 == self.config.displayWidth - 1:
+            oled.write_data(views.whole)
+            return 12 + 1 + len(views.whole)
+        chunks = views.chunks
+        sent = 12
+        for page in range(page0, page1 + 1):
+            first = page * views.perPage
+            for chunk in range(first + x0 // CHUNK, first + x1 // CHUNK + 1):
+                oled.write_data(chunks[chunk])
+                sent += 1 + CHUNK
+        return sent
+    # average bytes per flushed frame since startup
+    def bytesPerFrame(self):
+        if not self.frames:
+            return 0
+        return self.bytesSent // self.frames
+    # average microseconds it took to send a frame that had anything in it
+    def flushTime(self):
+        if not self.flushes:
+            return 0
+        return self.flushUs // self.flushes
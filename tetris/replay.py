@@ -0,0 +1,216 @@
+import struct
+from tetris.backends import BUTTON_COMBOS, BUTTON_MASKS
+from tetris.engine import Config, Game
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# replays: a game is the seed it was dealt plus which buttons were held on each step, so that's all a replay keeps
+# a replay is a header (MAGIC, a version byte, the step length in ms and the 4 byte seed) and then records, each counted in steps from the one before:
+#   a button record is one byte 0ddd bbbb: b is the buttons held from now on (a BUTTON_COMBOS mask) and d is how many steps it came after the
+#   last record, with d = 7 meaning the real count follows as a varint
+#   a checkpoint record is 1000 0000, a varint step count and a 4 byte hash of the game after that step (see gameHash), the last record is always one
+MAGIC = b'TR'
+# version 2 deals pieces from shuffled bags (bag.py), so a seed gives different pieces than it did in version 1,
+# version 3 clears lines before the next piece appears and tops out on the skyline, which can end a game differently than version 2
+VERSION = const(3)
+CHECKPOINT = const(0x80)
+# every checkpointEvery pieces a board hash is written, so a replay that drifts is caught close to where it happened
+CHECKPOINT_EVERY = const(1)
+
+# a 4 byte hash (djb2: h = h * 33 ^ value) of the stack, with the falling piece and the next one mixed in, so a replay dealing different
+# pieces is caught at the first checkpoint
+# like Xorshift it's kept as two 16 bit halves, since on the Pico an int over 30 bits lives on the heap, and the recorder hashes every lock
+class GameHash(object):
+    __slots__ = ('high', 'low')
+    def __init__(self):
+        self.high = 0
+        self.low = 5381
+    # mixes in a value under 65536
+    def add(self, value):
+        low = self.low * 33
+        self.high = (self.high * 33 + (low >> 16)) & 0xFFFF
+        self.low = (low & 0xFFFF) ^ value
+    def board(self, playArea):
+        self.high = 0
+        self.low = 5381
+        rows = playArea.rows
+        for i in range(len(rows)):
+            self.add(rows[i])
+    def game(self, game):
+        self.board(game.playArea)
+        self.add(ord(game.t1.pieceType))
+        self.add(ord(game.bag.peek(0)))
+    def value(self):
+        return (self.high << 16) | self.low
+
+def boardHash(playArea):
+    h = GameHash()
+    h.board(playArea)
+    return h.value()
+
+def gameHash(game):
+    h = GameHash()
+    h.game(game)
+    return h.value()
+
+# records a game as it's played: call record() after every step, and close() when the game is over
+# the buffer is allocated once, when it fills up it's written to stream (a file opened for writing) if there is one, otherwise recording stops
+class Recorder(object):
+    def __init__(self, game, stream = None, size = 4096):
+        self.buffer = bytearray(size)
+        self.stream = stream
+        self.length = 0
+        self.written = 0
+        self.full = False
+        self.steps = 0
+        self.lastRecord = 0
+        self.mask = 0
+        # the checkpoint hash is worked out in here and packed straight into buffer, so a checkpoint allocates nothing
+        self.hash = GameHash()
+        if self._room(8):
+            struct.pack_into('<2sBBI', self.buffer, 0, MAGIC, VERSION, game.config.stepMs, game.seed)
+            self.length = 8
+    # makes room for a whole record of up to size bytes before any of it is written, so a record is never cut in half,
+    # False if there isn't any and recording has stopped
+    def _room(self, size):
+        if self.length + size > len(self.buffer):
+            if self.stream is None:
+                self.full = True
+                return False
+            self.flush()
+        return True
+    # _byte and _varint write into the room made for their record
+    def _byte(self, value):
+        self.buffer[self.length] = value
+        self.length += 1
+    def _varint(self, value):
+        while value > 0x7F:
+            self._byte((value & 0x7F) | 0x80)
+            value >>= 7
+        self._byte(value)
+    # buttonPressed is what the game was given for the step that just ran
+    def record(self, game, buttonPressed):
+        if self.full:
+            return
+        mask = BUTTON_MASKS.get(buttonPressed, 0)
+        step = self.steps
+        if mask != self.mask:
+            # a button record is the byte and at most a 5 byte varint
+            if not self._room(6):
+                return
+            delta = step - self.lastRecord
+            if delta < 7:
+                self._byte((delta << 4) | mask)
+            else:
+                self._byte(0x70 | mask)
+                self._varint(delta)
+            self.lastRecord = step
+            self.mask = mask
+        if game.spawned and game.piecesPlaced % CHECKPOINT_EVERY == 0:
+            self._checkpoint(game, step)
+        self.steps += 1
+    # a checkpoint is the byte, at most a 5 byte varint and the 4 byte hash
+    def _checkpoint(self, game, step):
+        if self.full or not self._room(10):
+            return
+        self._byte(CHECKPOINT)
+        self._varint(step - self.lastRecord)
+        h = self.hash
+        h.game(game)
+        struct.pack_into('<HH', self.buffer, self.length, h.low, h.high)
+        self.length += 4
+        self.lastRecord = step
+    # ends the replay with a checkpoint on the last step and writes out whatever is still buffered
+    def close(self, game):
+        if self.steps:
+            self._checkpoint(game, self.steps - 1)
+        if self.stream is not None:
+            self.flush()
+    def flush(self):
+        self.stream.write(memoryview(self.buffer)[:self.length])
+        self.written += self.length
+        self.length = 0
+    # the replay so far, when there is no stream
+    def data(self):
+        return bytes(self.buffer[:self.length])
+
+# the varint at i and where it ends, or -1 if the data ends first
+def _readVarint(data, i):
+    value = 0
+    shift = 0
+    while True:
+        if i >= len(data):
+            return -1, i
+        byte = data[i]
+        i += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, i
+
+# plays a replay back as fast as the engine goes, returns the game as it ended and a list of (step, expected hash, actual hash) for
+# every checkpoint that didn't match, which is empty when the replay played back exactly as it was recorded
+# a record cut short at the end (a recording that ran out of room, or a file that wasn't all written) ends the replay there
+def replay(data, config = None):
+    magic, version, stepMs, seed = struct.unpack_from('<2sBBI', data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a replay")
+    if config is None:
+        config = Config()
+    if config.stepMs != stepMs:
+        raise ValueError("replay was recorded with %d ms steps, config has %d" % (stepMs, config.stepMs))
+    game = Game(config, seed)
+    mismatches = []
+    buttonPressed = 0
+    steps = 0
+    last = 0
+    i = struct.calcsize('<2sBBI')
+    while i < len(data):
+        byte = data[i]
+        i += 1
+        if byte == CHECKPOINT:
+            delta, i = _readVarint(data, i)
+            if delta < 0 or i + 4 > len(data):
+                break
+            expected = struct.unpack_from('<I', data, i)[0]
+            i += 4
+            last += delta
+            while steps <= last:
+                game.step(buttonPressed)
+                steps += 1
+            actual = gameHash(game)
+            if actual != expected:
+                mismatches.append((last, expected, actual))
+        else:
+            delta = (byte >> 4) & 7
+            if delta == 7:
+                delta, i = _readVarint(data, i)
+                if delta < 0:
+                    break
+            last += delta
+            while steps < last:
+                game.step(buttonPressed)
+                steps += 1
+            buttonPressed = BUTTON_COMBOS[byte & 0xF]
+    return game, mismatches
+
+##########################################################################################################################
+# run on a computer with: python -m tetris.replay game.replay, to play it back and check it
+if __name__ == '__main__':
+    import sys
+    import time
+    with open(sys.argv[1], 'rb') as f:
+        data = f.read()
+    start = time.perf_counter()
+    game, mismatches = replay(data)
+    elapsed = time.perf_counter() - start
+    print("%d bytes, %d steps (%.1f s of play) replayed in %.1f ms" % (len(data), game.frame, game.frame * game.config.stepMs / 1000, elapsed * 1000))
+    print("pieces %d, lines %d, lost %s" % (game.piecesPlaced, game.linesCleared, game.lost))
+    if mismatches:
+        for step, expected, actual in mismatches:
+            print("checkpoint at step %d: expected %08x, got %08x" % (step, expected, actual))
+        sys.exit(1)
+    print("all checkpoints match")
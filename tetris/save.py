@@ -0,0 +1,214 @@
+import struct
+from array import array
+from tetris.scheduler import ticks_us, ticks_diff
+from tetris.engine import gravityForLevel, normalDrop
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# saving: the high scores, and a game left part way through with 'MDLR' so it can be picked up at the next boot, go in one fixed size
+# binary record that's written in one go with a checksum on the end
+# the save file holds slots records back to back and every save goes into the slot after the newest one, so the writes are spread over
+# all of them and the record before is left alone: a record that was only half written when the power went fails its checksum and
+# load() falls back to the newest one that's whole, which makes every save all or nothing
+# it's a plain file, which is flash on the Pico (littlefs) and any file on a computer, so it works the same in both places
+# a record, little endian:
+#   the header: MAGIC, VERSION, flags (HAS_GAME if there's a game in it, LANDED if its piece had just locked) and a 4 byte sequence number that goes up by one every save
+#   config.highScoreCount high scores, each the score (4 bytes), lines (2 bytes), level (1 byte) and a spare byte, unused ones are zeros
+#   the game (zeros without HAS_GAME): GAME, then every play area row (2 bytes each), the bag's order, its queue, head and count
+#   the CRC-16 of everything before it
+# the record's size follows from the Config, a save made with a different height or preview count doesn't line up and fails its checksum
+MAGIC = b'TS'
+VERSION = const(1)
+HAS_GAME = const(1)
+LANDED = const(2)
+HEADER = '<2sBBI'
+SCORE = '<IHBx'
+# seed, rng high and low, score, frame, piecesPlaced, linesCleared, fallTime, level, the piece (as an index into pieceTypes), x, y, rotation
+GAME = '<IHHIIIHHBBbbB'
+
+# CRC-16/CCITT, a byte at a time from a table made once
+def crcTable():
+    table = array('H', [0] * 256)
+    for i in range(256):
+        crc = i << 8
+        for bit in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+        table[i] = crc
+    return table
+
+CRC_TABLE = crcTable()
+
+def crc16(data, length):
+    table = CRC_TABLE
+    crc = 0xFFFF
+    for i in range(length):
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ data[i]]
+    return crc
+
+# True if sequence number a came after b, allowing for them wrapping around
+def newer(a, b):
+    return 0 < ((a - b) & 0xFFFFFFFF) < 0x80000000
+
+class SaveStore(object):
+    def __init__(self, config, path, slots = 4):
+        self.config = config
+        self.path = path
+        self.slots = slots
+        self.highScoreCount = config.highScoreCount
+        queueSize = config.previewCount + 1 + len(config.pieceTypes)
+        self.rowsFormat = '<%dH' % config.height
+        # where every part of a record starts
+        self.scoresOffset = struct.calcsize(HEADER)
+        self.gameOffset = self.scoresOffset + struct.calcsize(SCORE) * self.highScoreCount
+        self.rowsOffset = self.gameOffset + struct.calcsize(GAME)
+        self.bagOffset = self.rowsOffset + struct.calcsize(self.rowsFormat)
+        self.queueOffset = self.bagOffset + len(config.pieceTypes)
+        self.crcOffset = self.queueOffset + queueSize + 2
+        self.size = self.crcOffset + 2
+        # record is the newest record, as loaded or as last saved
+        self.record = bytearray(self.size)
+        # highScores is a list of (score, lines, level), best first
+        self.highScores = []
+        # slot is where record is in the file, -1 before there's been one, hasGame is whether it holds a game
+        self.slot = -1
+        self.sequence = 0
+        self.hasGame = False
+        # how long the last load() and save() took, in microseconds, and how many records have been written
+        self.loadUs = 0
+        self.saveUs = 0
+        self.writes = 0
+    def _valid(self, data, start):
+        if data[start:start + 2] != MAGIC or data[start + 2] != VERSION:
+            return False
+        return crc16(memoryview(data)[start:], self.crcOffset) == struct.unpack_from('<H', data, start + self.crcOffset)[0]
+    # reads every slot and keeps the newest whole record, returns True if there was one
+    def load(self):
+        started = ticks_us()
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            self.loadUs = ticks_diff(ticks_us(), started)
+            return False
+        with f:
+            data = f.read(self.size * self.slots)
+        best = -1
+        for slot in range(min(self.slots, len(data) // self.size)):
+            start = slot * self.size
+            if not self._valid(data, start):
+                continue
+            sequence = struct.unpack_from(HEADER, data, start)[3]
+            if best < 0 or newer(sequence, self.sequence):
+                best = slot
+                self.sequence = sequence
+        if best >= 0:
+            self.slot = best
+            self.record[:] = data[best * self.size:(best + 1) * self.size]
+            self.hasGame = bool(self.record[3] & HAS_GAME)
+            self.highScores = []
+            for i in range(self.highScoreCount):
+                score, lines, level = struct.unpack_from(SCORE, self.record, self.scoresOffset + i * struct.calcsize(SCORE))
+                if score:
+                    self.highScores.append((score, lines, level))
+        self.loadUs = ticks_diff(ticks_us(), started)
+        return best >= 0
+    # puts the saved game into game (a new Game made with the same Config) so it carries on where it was left
+    def resume(self, game):
+        config = game.config
+        record = self.record
+        (seed, high, low, score, frame, piecesPlaced, linesCleared, fallTime, level,
+            piece, x, y, rotation) = struct.unpack_from(GAME, record, self.gameOffset)
+        game.seed = seed
+        game.rng.high = high
+        game.rng.low = low
+        game.score = score
+        game.frame = frame
+        game.piecesPlaced = piecesPlaced
+        game.linesCleared = linesCleared
+        game.fallTime = fallTime
+        game.level = level
+        config.gravity = gravityForLevel(config, level)
+        normalDrop(config)
+        game.holdTick = 0
+        game.holdingButton = False
+        game.lost = False
+        game.spawned = True
+        game.playArea.load(struct.unpack_from(self.rowsFormat, record, self.rowsOffset))
+        bag = game.bag
+        bag.bag[:] = record[self.bagOffset:self.bagOffset + len(bag.bag)]
+        bag.queue[:] = record[self.queueOffset:self.queueOffset + bag.size]
+        bag.head = record[self.queueOffset + bag.size]
+        bag.count = record[self.queueOffset + bag.size + 1]
+        game.t1.spawn(config.pieceTypes[piece], config, game.playArea)
+        game.t1.moveTo(rotation, x, y, game.playArea)
+        # a piece that had locked is already in the rows, the next step brings the next piece on
+        game.t1.active = not record[3] & LANDED
+    # adds a finished game to the high scores if it made it, returns its place (0 is the best) or -1 if it didn't
+    def addScore(self, game):
+        scores = self.highScores
+        if not game.score:
+            return -1
+        place = 0
+        while place < len(scores) and scores[place][0] >= game.score:
+            place += 1
+        if place >= self.highScoreCount:
+            return -1
+        scores.insert(place, (game.score, game.linesCleared, game.level))
+        del scores[self.highScoreCount:]
+        return place
+    # writes the high scores, with game in the record too if there is one, into the slot after the newest
+    def save(self, game = None):
+        started = ticks_us()
+        config = self.config
+        record = self.record
+        for i in range(self.size):
+            record[i] = 0
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        flags = 0
+        if game:
+            flags = HAS_GAME if game.t1.active else HAS_GAME | LANDED
+        struct.pack_into(HEADER, record, 0, MAGIC, VERSION, flags, self.sequence)
+        for i in range(len(self.highScores)):
+            score, lines, level = self.highScores[i]
+            struct.pack_into(SCORE, record, self.scoresOffset + i * struct.calcsize(SCORE), score, min(lines, 0xFFFF), min(level, 0xFF))
+        if game:
+            t1 = game.t1
+            bag = game.bag
+            struct.pack_into(GAME, record, self.gameOffset, game.seed & 0xFFFFFFFF, game.rng.high, game.rng.low, game.score, game.frame,
+                game.piecesPlaced, min(game.linesCleared, 0xFFFF), game.fallTime, min(game.level, 0xFF), config.pieceTypes.index(t1.pieceType),
+                t1.x, t1.y, t1.rotationState)
+            struct.pack_into(self.rowsFormat, record, self.rowsOffset, *game.playArea.rows)
+            record[self.bagOffset:self.bagOffset + len(bag.bag)] = bag.bag
+            record[self.queueOffset:self.queueOffset + bag.size] = bag.queue
+            record[self.queueOffset + bag.size] = bag.head
+            record[self.queueOffset + bag.size + 1] = bag.count
+        struct.pack_into('<H', record, self.crcOffset, crc16(record, self.crcOffset))
+        self.slot = (self.slot + 1) % self.slots
+        self._write(self.slot * self.size)
+        self.hasGame = game is not None
+        self.writes += 1
+        self.saveUs = ticks_diff(ticks_us(), started)
+    # writes record at offset in the file, making the file (every slot empty) first if it isn't there or is too short
+    def _write(self, offset):
+        try:
+            f = open(self.path, 'r+b')
+        except OSError:
+            f = open(self.path, 'wb')
+        with f:
+            length = f.seek(0, 2)
+            if length < self.size * self.slots:
+                f.write(bytes(self.size * self.slots - length))
+            f.seek(offset)
+            f.write(self.record)
+            f.flush()
+            # on a computer the record is pushed out to the disk before save() returns, on the Pico closing the file commits it
+            try:
+                import os
+                os.fsync(f.fileno())
+            except (ImportError, AttributeError):
+                pass
@@ -0,0 +1,81 @@
+import time
+
+# millisecond clock: MicroPython's time has ticks_ms and friends, which wrap around, so differences always go through ticks_diff
+# on a computer they're stood in for by the monotonic clock, wrapped the same way (at 2 ** 30) so the values fit where the real ones do
+try:
+    ticks_ms = time.ticks_ms
+    ticks_us = time.ticks_us
+    ticks_add = time.ticks_add
+    ticks_diff = time.ticks_diff
+    sleep_ms = time.sleep_ms
+    sleep_us = time.sleep_us
+    # NATIVE is True on the Pico, where ticks_ms() counts from power on
+    NATIVE = True
+except AttributeError:
+    NATIVE = False
+    TICKS_MAX = (1 << 30) - 1
+    TICKS_HALF = 1 << 29
+    def ticks_ms():
+        return (time.monotonic_ns() // 1000000) & TICKS_MAX
+    def ticks_us():
+        return (time.monotonic_ns() // 1000) & TICKS_MAX
+    def ticks_add(ticks, delta):
+        return (ticks + delta) & TICKS_MAX
+    def ticks_diff(ticks1, ticks2):
+        return ((ticks1 - ticks2 + TICKS_HALF) & TICKS_MAX) - TICKS_HALF
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+    def sleep_us(us):
+        time.sleep(us / 1000000)
+
+# fixed timestep scheduler: the game steps every config.stepMs and a frame is drawn at most every 1000 / config.frameCap,
+# each on its own deadline, so a slow frame costs frames rather than game speed
+class Scheduler(object):
+    def __init__(self, config):
+        self.stepMs = config.stepMs
+        self.frameMs = 1000 // config.frameCap
+        self.maxCatchUp = config.maxCatchUp
+        now = ticks_ms()
+        self.nextStep = now
+        self.nextFrame = now
+        # steps and frames are what actually ran, skippedFrames are frames there was no time to draw,
+        # droppedSteps are steps given up on after a stall longer than maxCatchUp steps
+        self.steps = 0
+        self.frames = 0
+        self.skippedFrames = 0
+        self.droppedSteps = 0
+    # how many game steps are due at now (a ticks_ms() value)
+    def dueSteps(self, now):
+        late = ticks_diff(now, self.nextStep)
+        if late < 0:
+            return 0
+        due = late // self.stepMs + 1
+        if due > self.maxCatchUp:
+            self.droppedSteps += due - self.maxCatchUp
+            due = self.maxCatchUp
+            self.nextStep = ticks_add(now, self.stepMs)
+        else:
+            self.nextStep = ticks_add(self.nextStep, due * self.stepMs)
+        self.steps += due
+        return due
+    # True if a frame should be drawn at now, frames that were missed are counted and not made up
+    def frameDue(self, now):
+        late = ticks_diff(now, self.nextFrame)
+        if late < 0:
+            return False
+        if late >= self.frameMs:
+            self.skippedFrames += late // self.frameMs
+            self.nextFrame = ticks_add(now, self.frameMs)
+        else:
+            self.nextFrame = ticks_add(self.nextFrame, self.frameMs)
+        self.frames += 1
+        return True
+    # how many ms until the next step or frame is due, 0 if one is due already
+    def delay(self):
+        now = ticks_ms()
+        return max(0, min(ticks_diff(self.nextStep, now), ticks_diff(self.nextFrame, now)))
+    # sleeps until the next step or frame is due
+    def wait(self):
+        delay = self.delay()
+        if delay > 0:
+            sleep_ms(delay)
@@ -0,0 +1,79 @@
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+from tetris.protocol import SIZE, SYNC
+
+# what carries the messages of a versus match (see protocol.py) between the two games: await send(data) sends one message,
+# await recv() gives the next one, or None once the other end has gone, close() hangs up
+# sharedClock is True when both ends read the same ticks_us(), so a message's stamp can be compared with the time it arrived
+
+# a byte stream: a UART on the Pico, a socket on a computer, read a whole message at a time
+class StreamTransport(object):
+    def __init__(self, reader, writer, sharedClock = False):
+        self.reader = reader
+        self.writer = writer
+        self.sharedClock = sharedClock
+    # a message to an end that has hung up goes nowhere, recv() says it's gone
+    async def send(self, data):
+        try:
+            self.writer.write(data)
+            await self.writer.drain()
+        except OSError:
+            pass
+    async def recv(self):
+        try:
+            data = await self.reader.readexactly(SIZE)
+            # lost its place (a dropped byte), so it moves on a byte at a time until a message starts
+            while data[0] & 0xF0 != SYNC:
+                data = data[1:] + await self.reader.readexactly(1)
+        except (EOFError, OSError):
+            return None
+        return data
+    def close(self):
+        self.writer.close()
+
+# the other Pico on a UART (the pins and speed are in Config), crossed over: tx to rx and rx to tx, and a common ground
+def uartTransport(config):
+    from machine import Pin, UART
+    uart = UART(config.uartId, baudrate = config.uartBaud, tx = Pin(config.uartTx), rx = Pin(config.uartRx))
+    return StreamTransport(asyncio.StreamReader(uart), asyncio.StreamWriter(uart, {}))
+
+# a computer: connects to a SocketServer on host
+async def connectSocket(host, port, sharedClock = False):
+    reader, writer = await asyncio.open_connection(host, port)
+    return StreamTransport(reader, writer, sharedClock)
+
+# takes the connections made to port, each is handed out by accept() in the order they came in
+class SocketServer(object):
+    def __init__(self, sharedClock = False):
+        self.sharedClock = sharedClock
+        self.accepted = asyncio.Queue()
+        self.server = None
+    async def start(self, host, port):
+        self.server = await asyncio.start_server(self._connected, host, port)
+        return self
+    async def _connected(self, reader, writer):
+        await self.accepted.put(StreamTransport(reader, writer, self.sharedClock))
+    async def accept(self):
+        return await self.accepted.get()
+    def close(self):
+        self.server.close()
+
+# two games in one process, each end's messages go straight into the other's queue (asyncio.Queue is only there on a computer)
+class QueueTransport(object):
+    def __init__(self, inbox, outbox):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.sharedClock = True
+    async def send(self, data):
+        self.outbox.put_nowait(bytes(data))
+    async def recv(self):
+        return await self.inbox.get()
+    def close(self):
+        self.outbox.put_nowait(None)
+
+def queuePair():
+    a = asyncio.Queue()
+    b = asyncio.Queue()
+    return QueueTransport(a, b), QueueTransport(b, a)
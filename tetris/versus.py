@@ -0,0 +1,140 @@
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+from tetris.engine import Xorshift
+from tetris.scheduler import ticks_us, ticks_diff
+from tetris.app import GameLoop
+from tetris.protocol import encode, decode, Latency, SIZE, HELLO, GARBAGE, LOCK, OVER, ECHO, VERSION, LOST, STOPPED
+from tetris.transports import uartTransport
+
+# versus: two games side by side, each on its own Pico (or both in one process on a computer), joined by a transport (see transports.py)
+# every piece that locks is sent to the opponent, and the lines it clears send garbage rows (config.garbageLines) the opponent has to take
+# the game loop (app.py's GameLoop, so 'MDLR', the flush thread, gc stats and the profiler work as they do in a game on its own) is a
+# task on asyncio (uasyncio on the Pico) with a second task listening to the link, so neither waits on the other: the game yields while
+# it waits for its next step, which is when the messages that came in are dealt with
+class Player(object):
+    def __init__(self, game, buttons, transport, renderer = None, realtime = True, maxFrames = 0, monitor = None, flusher = None):
+        self.game = game
+        self.transport = transport
+        # realtime runs on the step clock, otherwise the game goes as fast as it can and lets the other tasks run after every step
+        self.loop = GameLoop(game.config, game, buttons, renderer, monitor = monitor, flusher = flusher, realtime = realtime)
+        self.maxFrames = maxFrames
+        # the hole in each garbage row sent comes from a generator of its own, so sending garbage doesn't change the pieces dealt
+        self.holes = Xorshift(game.seed ^ 0x2545F491)
+        # outgoing and echoing are the messages being sent, one buffer each since the game and the listener both send
+        self.outgoing = bytearray(SIZE)
+        self.echoing = bytearray(SIZE)
+        self.linesBefore = 0
+        self.stopped = False
+        # what's known about the opponent
+        self.opponentSeed = None
+        self.opponentVersion = None
+        self.opponentPieces = 0
+        self.opponentHeight = 0
+        self.opponentOver = False
+        self.opponentLost = False
+        self.rowsSent = 0
+        self.rowsReceived = 0
+        self.messagesSent = 0
+        self.messagesReceived = 0
+        # latency is from reading the input that locked a piece to the opponent getting the message, only timed when both ends share a
+        # clock, roundTrip is from that input to the echo coming back, which any transport can time
+        self.latency = Latency()
+        self.roundTrip = Latency()
+    async def _send(self, buffer, kind, a = 0, b = 0, c = 0, stamp = 0):
+        encode(buffer, kind, a, b, c, stamp)
+        await self.transport.send(buffer)
+        self.messagesSent += 1
+    # the game: steps on the clock until it's lost, it's quit with 'MDLR', the opponent is done or maxFrames is up
+    async def play(self):
+        game = self.game
+        loop = self.loop
+        await self._send(self.outgoing, HELLO, VERSION, stamp = game.seed)
+        while not (game.lost or loop.quit or self.opponentOver or self.stopped):
+            steps = loop.due()
+            while steps:
+                stamp = ticks_us()
+                playing = loop.step()
+                if game.spawned:
+                    await self._placed(stamp)
+                if not playing:
+                    break
+                if self.maxFrames and game.frame >= self.maxFrames:
+                    self.stopped = True
+                    break
+                steps -= 1
+            loop.show()
+            await asyncio.sleep(loop.delay() / 1000)
+            loop.idle()
+        await self._send(self.outgoing, OVER, LOST if game.lost else STOPPED)
+    # a piece locked: it goes to the opponent, with the garbage its lines send
+    async def _placed(self, stamp):
+        game = self.game
+        playArea = game.playArea
+        cleared = game.linesCleared - self.linesBefore
+        self.linesBefore = game.linesCleared
+        await self._send(self.outgoing, LOCK, game.piecesPlaced & 0xFF, cleared, playArea.height - 1 - min(playArea.tops), stamp)
+        if game.attack:
+            self.rowsSent += game.attack
+            await self._send(self.outgoing, GARBAGE, game.attack, self.holes.randrange(playArea.width), 0, stamp)
+    # the link: takes in the opponent's messages until it hangs up
+    async def listen(self):
+        transport = self.transport
+        while True:
+            data = await transport.recv()
+            if data is None:
+                self.opponentOver = True
+                return
+            self.messagesReceived += 1
+            kind, a, b, c, stamp = decode(data)
+            if kind == GARBAGE or kind == LOCK:
+                if transport.sharedClock:
+                    self.latency.add(ticks_diff(ticks_us(), stamp))
+                await self._send(self.echoing, ECHO, kind, 0, 0, stamp)
+                if kind == GARBAGE:
+                    self.game.receiveGarbage(a, b)
+                    self.rowsReceived += a
+                else:
+                    self.opponentPieces = a
+                    self.opponentHeight = c
+            elif kind == ECHO:
+                self.roundTrip.add(ticks_diff(ticks_us(), stamp))
+            elif kind == HELLO:
+                self.opponentVersion = a
+                self.opponentSeed = stamp
+            elif kind == OVER:
+                self.opponentOver = True
+                self.opponentLost = a == LOST
+    # plays the match to the end and hangs up
+    async def run(self):
+        listener = asyncio.create_task(self.listen())
+        try:
+            await self.play()
+        finally:
+            self.transport.close()
+            listener.cancel()
+            try:
+                await listener
+            except asyncio.CancelledError:
+                pass
+        return self.result()
+    def result(self):
+        if self.game.lost:
+            return 'lost'
+        if self.opponentLost:
+            return 'won'
+        return 'stopped'
+    def report(self):
+        lines = ["versus: %s after %d pieces, %d rows of garbage sent, %d taken, %d messages sent, %d received" % (self.result(),
+            self.game.piecesPlaced, self.rowsSent, self.rowsReceived, self.messagesSent, self.messagesReceived)]
+        if self.latency.count:
+            lines.append("input to opponent: " + self.latency.report())
+        lines.append("round trip: " + self.roundTrip.report())
+        return '\n'.join(lines)
+
+# versus on the Pico, against the Pico on the other end of the UART in Config
+def playVersus(config, game, buttons, renderer, monitor = None, flusher = None):
+    player = Player(game, buttons, uartTransport(config), renderer, monitor = monitor, flusher = flusher)
+    asyncio.run(player.run())
+    return player